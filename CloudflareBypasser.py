@@ -1,11 +1,87 @@
 import time
+from urllib.parse import urlparse
 from DrissionPage import ChromiumPage
 
+# Challenge states reported by CloudflareBypasser.bypass
+LOADING = "loading"
+INTERACTIVE = "interactive"
+REDIRECTING = "redirecting"
+SOLVED = "solved"
+BLOCKED = "blocked"
+
+# Everything needed to classify the page, read in one round trip
+CHALLENGE_PROBE_SCRIPT = """
+    const title = document.title.toLowerCase();
+    const text = (document.body ? document.body.innerText : '').slice(0, 5000).toLowerCase();
+    const nav = performance.getEntriesByType('navigation')[0];
+    const token = document.querySelector('input[name*="turnstile"][type="hidden"], input[name="cf-turnstile-response"]');
+    return {
+        url: location.href,
+        status: nav && nav.responseStatus ? nav.responseStatus : null,
+        blocked: title.includes('attention required') || title.includes('access denied') ||
+            text.includes('you have been blocked') || !!document.querySelector('#cf-error-details, .cf-error-details'),
+        challenge: title.includes('just a moment') ||
+            !!document.querySelector('#challenge-form, #challenge-running, #challenge-stage, #challenge-body-text'),
+        widget: !!token || !!document.querySelector('iframe[src*="challenges.cloudflare.com"]'),
+        token: !!(token && token.value),
+        success: !!document.querySelector('#challenge-success-text') || text.includes('verification successful')
+    };
+"""
+
+
+class BypassResult:
+    """Outcome of CloudflareBypasser.bypass"""
+
+    def __init__(self, state, attempts, clicks, elapsed, url):
+        self.state = state
+        self.attempts = attempts
+        self.clicks = clicks
+        self.elapsed = elapsed
+        self.url = url
+
+    @property
+    def success(self):
+        return self.state == SOLVED
+
+    def as_dict(self):
+        return {"state": self.state, "success": self.success, "attempts": self.attempts,
+                "clicks": self.clicks, "elapsed": round(self.elapsed, 2), "url": self.url}
+
+
+# Finds the Turnstile widget in one round trip: walks the light DOM, open shadow roots
+# and same-origin iframes in the page, and returns the widget host (or its iframe)
+TURNSTILE_LOCATOR_SCRIPT = """
+    const find = root => {
+        const input = root.querySelector('input[name*="turnstile"][type="hidden"]');
+        if (input) return input.parentElement;
+        const frame = root.querySelector('iframe[src*="challenges.cloudflare.com"]');
+        if (frame) return frame;
+        for (const el of root.querySelectorAll('*')) {
+            if (el.shadowRoot) {
+                const found = find(el.shadowRoot);
+                if (found) return found;
+            }
+            if (el.tagName === 'IFRAME') {
+                try {
+                    const found = el.contentDocument && find(el.contentDocument);
+                    if (found) return found;
+                } catch (e) {}
+            }
+        }
+        return null;
+    };
+    return find(document);
+"""
+
 class CloudflareBypasser:
-    def __init__(self, driver: ChromiumPage, max_retries=-1, log=True):
+    def __init__(self, driver: ChromiumPage, max_retries=-1, log=True, timeout=60, base_wait=0.5, max_wait=8):
         self.driver = driver
+        # Maximum clicks on the widget; -1 for no limit (the timeout still applies)
         self.max_retries = max_retries
         self.log = log
+        self.timeout = timeout
+        self.base_wait = base_wait
+        self.max_wait = max_wait
 
     def search_recursively_shadow_root_with_iframe(self,ele):
         if ele.shadow_root:
@@ -29,28 +105,55 @@ class CloudflareBypasser:
                     return result
         return None
     
+    def locate_cf_button_in_page(self):
+        """Locate the checkbox from the widget host found by one injected script
+
+        Closed shadow roots and the cross-origin challenge iframe are invisible to
+        page scripts, so the last few hops are taken through CDP from the host.
+        """
+        host = self.driver.run_js(TURNSTILE_LOCATOR_SCRIPT)
+        if not host:
+            return None
+        if host.tag == "iframe":
+            return self.search_recursively_shadow_root_with_cf_input(host("tag:body"))
+        return host.shadow_root.child()("tag:body").shadow_root("tag:input")
+
     def locate_cf_button(self):
         button = None
-        eles = self.driver.eles("tag:input")
-        for ele in eles:
-            if "name" in ele.attrs.keys() and "type" in ele.attrs.keys():
-                if "turnstile" in ele.attrs["name"] and ele.attrs["type"] == "hidden":
-                    button = ele.parent().shadow_root.child()("tag:body").shadow_root("tag:input")
-                    break
+        started = time.monotonic()
+        try:
+            button = self.locate_cf_button_in_page()
+        except Exception as e:
+            self.log_message(f"In-page search failed: {e}")
             
         if button:
+            self.log_message(f"Button located in page in {time.monotonic() - started:.2f}s.")
             return button
         else:
             # If the button is not found, search it recursively
-            self.log_message("Basic search failed. Searching for button recursively.")
+            self.log_message("In-page search failed. Searching for button recursively.")
             ele = self.driver.ele("tag:body")
             iframe = self.search_recursively_shadow_root_with_iframe(ele)
             if iframe:
                 button = self.search_recursively_shadow_root_with_cf_input(iframe("tag:body"))
             else:
                 self.log_message("Iframe not found. Button search failed.")
+            self.log_message(f"Recursive search took {time.monotonic() - started:.2f}s.")
             return button
 
+    def export_clearance(self, cache):
+        """Store this session's cookies and user agent so plain HTTP clients can reuse the clearance"""
+        cookies = self.driver.cookies(all_info=True)
+        clearance = next((cookie for cookie in cookies if cookie['name'] == 'cf_clearance'), None)
+        expires = clearance.get('expires') if clearance else None
+        cache.put(
+            urlparse(self.driver.url).netloc.lower(),
+            {cookie['name']: cookie['value'] for cookie in cookies},
+            self.driver.user_agent,
+            expires if expires and expires > 0 else None
+        )
+        self.log_message(f"Exported {len(cookies)} cookies{' including cf_clearance' if clearance else ''}.")
+
     def log_message(self, message):
         if self.log:
             print(message)
@@ -68,28 +171,76 @@ class CloudflareBypasser:
             self.log_message(f"Error clicking verification button: {e}")
 
     def is_bypassed(self):
+        signals = self.probe()
+        return bool(signals) and not signals["challenge"] and not signals["blocked"]
+
+    def probe(self):
+        """Read the challenge signals from the page in one round trip"""
         try:
-            title = self.driver.title.lower()
-            return "just a moment" not in title
+            return self.driver.run_js(CHALLENGE_PROBE_SCRIPT)
         except Exception as e:
-            self.log_message(f"Error checking page title: {e}")
-            return False
+            self.log_message(f"Error probing page: {e}")
+            return None
+
+    def challenge_state(self, signals, last_url):
+        if not signals:
+            return LOADING
+        if signals["blocked"]:
+            return BLOCKED
+        if not signals["challenge"]:
+            return SOLVED
+        if signals["token"] or signals["success"] or signals["url"] != last_url:
+            return REDIRECTING
+        if signals["widget"]:
+            return INTERACTIVE
+        return LOADING
 
     def bypass(self):
-        try_count = 0
+        """Drive the challenge to a final state, clicking only when the widget is interactive
+
+        Polls back off exponentially while nothing changes and reset on every
+        state change. Gives up on a hard block, after max_retries clicks, or
+        once the timeout runs out.
+        """
+        started = time.monotonic()
+        last_url = self.driver.url
+        attempts = 0
+        clicks = 0
+        idle_polls = 0
+        state = previous = None
+        signals = None
 
-        while not self.is_bypassed():
-            if 0 < self.max_retries + 1 <= try_count:
-                self.log_message("Exceeded maximum retries. Bypass failed.")
+        while time.monotonic() - started < self.timeout:
+            attempts += 1
+            signals = self.probe()
+            state = self.challenge_state(signals, last_url)
+            if signals:
+                last_url = signals["url"]
+            if state != previous:
+                self.log_message(f"Attempt {attempts}: challenge {state} "
+                                 f"(status {signals and signals['status']}, {time.monotonic() - started:.1f}s)")
+                idle_polls = 0
+            previous = state
+
+            if state in (SOLVED, BLOCKED):
                 break
 
-            self.log_message(f"Attempt {try_count + 1}: Verification page detected. Trying to bypass...")
-            self.click_verification_button()
+            if state == INTERACTIVE:
+                if 0 <= self.max_retries <= clicks:
+                    self.log_message("Exceeded maximum retries. Bypass failed.")
+                    break
+                click_started = time.monotonic()
+                self.click_verification_button()
+                clicks += 1
+                self.log_message(f"Click {clicks} took {time.monotonic() - click_started:.2f}s.")
 
-            try_count += 1
-            time.sleep(2)
+            time.sleep(min(self.max_wait, self.base_wait * 2 ** idle_polls))
+            idle_polls += 1
 
-        if self.is_bypassed():
-            self.log_message("Bypass successful.")
+        result = BypassResult(state, attempts, clicks, time.monotonic() - started,
+                              signals["url"] if signals else self.driver.url)
+        if result.success:
+            self.log_message(f"Bypass successful in {result.elapsed:.1f}s.")
         else:
-            self.log_message("Bypass failed.") 
\ No newline at end of file
+            self.log_message(f"Bypass failed: {state} after {result.elapsed:.1f}s.")
+        return result
@@ -0,0 +1,184 @@
+import asyncio
+import time
+from contextlib import AsyncExitStack
+from urllib.parse import urlparse
+from playwright.async_api import async_playwright
+from http_fetch import HttpFetcher, looks_like_challenge
+from rate_limiter import shared_limiter
+from async_runner import run_sync
+from readiness import Readiness
+from browser_service import open_browser_async
+from page_archive import shared_archive
+
+
+class ArticleJob:
+    """A single article page to visit and extract with an in-page script"""
+
+    def __init__(self, url, script, wait_for=None, arg=None, timeout=30000, error_name=None,
+                 parse=None, html=None, ready=None):
+        self.url = url
+        self.script = script
+        self.wait_for = wait_for
+        # Readiness condition; defaults to wait_for being present with a quiet DOM
+        self.ready = ready or (Readiness(selector=wait_for, timeout=timeout) if wait_for else None)
+        self.arg = arg
+        self.timeout = timeout
+        # When set, a screenshot and the page HTML are saved under this name on failure
+        self.error_name = error_name
+        # Optional parse(html, url) used on the HTTP path; returns None when the HTML is unusable
+        self.parse = parse
+        # HTML already in hand (e.g. from a JSON API); parsed without any fetch when set
+        self.html = html
+
+
+class ArticlePool:
+    """Fetches many article pages concurrently over a bounded pool of tabs in one browser
+
+    With http_ok=True, jobs that carry a parse function are first fetched over a
+    pooled HTTP client, and only fall back to a browser tab when the response is
+    a JS shell or a challenge page. The browser is launched on first fallback.
+
+    Every request, HTTP or browser, is paced by an adaptive per-domain rate limiter.
+    """
+
+    def __init__(self, browser_type="chromium", concurrency=4, per_domain=2, rate_limiter=None,
+                 headless=False, viewport=None, http_ok=False, resource_policy=None, archive=None):
+        self.browser_type = browser_type
+        self.concurrency = concurrency
+        self.per_domain = per_domain
+        self.rate_limiter = rate_limiter or shared_limiter
+        self.headless = headless
+        self.viewport = viewport or {'width': 1920, 'height': 1080}
+        self.http_ok = http_ok
+        # ResourcePolicy applied to every tab; its report is printed after each run
+        self.resource_policy = resource_policy
+        # Rendered pages are archived after extraction; an offline archive serves them back instead
+        self.archive = archive or shared_archive
+
+    def _domain(self, url):
+        return urlparse(url).netloc.lower()
+
+    async def _goto(self, page, job):
+        if self.archive.offline:
+            # Served from the archive by the route open_browser_async installs
+            await page.goto(job.url, timeout=job.timeout)
+            return
+        domain = self._domain(job.url)
+        await self.rate_limiter.acquire(domain)
+        started = time.monotonic()
+        try:
+            response = await page.goto(job.url, timeout=job.timeout)
+        except Exception:
+            self.rate_limiter.report(domain, error=True)
+            raise
+        status = response.status if response else None
+        self.rate_limiter.report(domain, status=status, latency=time.monotonic() - started,
+                                 challenge=looks_like_challenge(status, await page.title()))
+
+    async def _extract(self, page, job):
+        await self._goto(page, job)
+        if job.ready:
+            await job.ready.wait_async(page)
+        if not self.archive.offline:
+            self.archive.put(job.url, await page.content())
+        if job.arg is None:
+            return await page.evaluate(job.script)
+        return await page.evaluate(job.script, job.arg)
+
+    async def _fetch_http(self, http, job):
+        try:
+            html = await http.fetch_html(job.url)
+            if html is None:
+                return None
+            return job.parse(html, job.url)
+        except Exception as e:
+            print(f"HTTP fetch failed for {job.url}, falling back to browser: {str(e)}")
+            return None
+
+    async def _save_error(self, page, job):
+        try:
+            await page.screenshot(path=f"{job.error_name}.png")
+            with open(f"{job.error_name}.html", "w", encoding="utf-8") as f:
+                f.write(await page.content())
+        except Exception as e:
+            print(f"Could not save error artifacts for {job.url}: {str(e)}")
+
+    async def fetch_all(self, jobs, on_result=None):
+        """Run every job and return their results in job order (None for failures)"""
+        results = [None] * len(jobs)
+        if not jobs:
+            return results
+
+        domain_slots = {}
+        for job in jobs:
+            domain = self._domain(job.url)
+            if domain not in domain_slots:
+                domain_slots[domain] = asyncio.Semaphore(self.per_domain)
+
+        http = HttpFetcher(max_connections=self.concurrency * 2, rate_limiter=self.rate_limiter,
+                           archive=self.archive)
+        async with async_playwright() as p, http, AsyncExitStack() as browser_stack:
+            browser = {}
+            browser_lock = asyncio.Lock()
+            idle_pages = asyncio.Queue()
+
+            async def acquire_page():
+                async with browser_lock:
+                    if 'context' not in browser:
+                        # Attaches to the warm browser service when it is running
+                        browser['context'] = await browser_stack.enter_async_context(
+                            open_browser_async(p, self.browser_type, self.headless, viewport=self.viewport)
+                        )
+                        for _ in range(min(self.concurrency, len(jobs))):
+                            page = await browser['context'].new_page()
+                            if self.resource_policy:
+                                await self.resource_policy.install_async(page)
+                            idle_pages.put_nowait(page)
+                return await idle_pages.get()
+
+            async def fetch_browser(job):
+                page = None
+                try:
+                    page = await acquire_page()
+                    return await self._extract(page, job)
+                except Exception as e:
+                    print(f"Error scraping article {job.url}: {str(e)}")
+                    if job.error_name and page is not None:
+                        await self._save_error(page, job)
+                    return None
+                finally:
+                    if page is not None:
+                        idle_pages.put_nowait(page)
+
+            async def run(idx, job):
+                if job.parse and job.html is not None:
+                    try:
+                        results[idx] = job.parse(job.html, job.url)
+                    except Exception as e:
+                        # One site parser failing must not take the other jobs' results with it
+                        print(f"Error parsing article {job.url}, falling back to fetching it: {str(e)}")
+                    if results[idx] is not None:
+                        if on_result:
+                            on_result(idx, results[idx])
+                        return
+
+                async with domain_slots[self._domain(job.url)]:
+                    if self.http_ok and job.parse:
+                        results[idx] = await self._fetch_http(http, job)
+                    if results[idx] is None:
+                        results[idx] = await fetch_browser(job)
+
+                    if on_result:
+                        on_result(idx, results[idx])
+
+            await asyncio.gather(*(run(idx, job) for idx, job in enumerate(jobs)))
+
+        if self.resource_policy and 'context' in browser:
+            print(self.resource_policy.report())
+        print(self.rate_limiter.summary())
+
+        return results
+
+    def run(self, jobs, on_result=None):
+        """Synchronous entry point, safe to call from inside a sync_playwright block"""
+        return run_sync(self.fetch_all(jobs, on_result))
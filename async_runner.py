@@ -0,0 +1,30 @@
+import asyncio
+import threading
+
+
+def run_sync(coro):
+    """Run a coroutine to completion from synchronous code
+
+    Inside a sync_playwright block an event loop is already running on this
+    thread, so the coroutine then gets its own loop on a helper thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    outcome = {}
+
+    def target():
+        try:
+            outcome['result'] = asyncio.run(coro)
+        except BaseException as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join()
+
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['result']
@@ -1,17 +1,14 @@
-import time
 import logging
 import os
-from CloudflareBypasser import CloudflareBypasser
-from DrissionPage import ChromiumPage, ChromiumOptions
-from bs4 import BeautifulSoup
+from page_parser import parse
+from drission_session import shared_session
 import json
-import random
 
 class BanklessScraper:
-    def __init__(self):
+    def __init__(self, session=None):
         self.base_url = "https://www.bankless.com"
         self.blog_url = f"{self.base_url}/read"
-        self.driver = None
+        self.session = session or shared_session
         
         # Configure logging
         logging.basicConfig(
@@ -23,73 +20,27 @@ class BanklessScraper:
             ]
         )
 
-    def random_sleep(self, min_seconds=2, max_seconds=5):
-        time.sleep(random.uniform(min_seconds, max_seconds))
-
-    def init_driver(self):
-        """Initialize ChromiumPage with proper options"""
-        try:
-            logging.info("Initializing driver...")
-            
-            # Configure Chrome options
-            options = ChromiumOptions().auto_port()
-            arguments = [
-                "-no-first-run",
-                "-force-color-profile=srgb",
-                "-metrics-recording-only",
-                "-password-store=basic",
-                "-use-mock-keychain",
-                "-export-tagged-pdf",
-                "-no-default-browser-check",
-                "-disable-background-mode",
-                "-enable-features=NetworkService,NetworkServiceInProcess",
-                "-disable-features=FlashDeprecationWarning",
-                "-disable-gpu",
-                "-accept-lang=en-US",
-            ]
-            
-            for argument in arguments:
-                options.set_argument(argument)
-            
-            # Initialize driver
-            self.driver = ChromiumPage(addr_or_opts=options)
-            
-            # Access site and bypass Cloudflare
-            logging.info("Accessing site and bypassing Cloudflare...")
-            self.driver.get(self.base_url)
-            
-            cf_bypasser = CloudflareBypasser(self.driver)
-            cf_bypasser.bypass()
-            
-            logging.info("Successfully bypassed Cloudflare!")
-            self.random_sleep(3, 5)
-            
-            return True
-            
-        except Exception as e:
-            logging.error(f"Error initializing driver: {e}")
-            return False
-
     def scrape_articles(self):
         """Scrape all articles from the blog page"""
         try:
             logging.info("\nAccessing blog page...")
-            self.driver.get(self.blog_url)
-            self.random_sleep(3, 5)
+            html = self.session.fetch_pages(self.base_url, [self.blog_url]).get(self.blog_url)
+            if not html or 'articleBlockSmall' not in html:
+                html = self.session.browser_html(self.base_url, self.blog_url, "#filterAjax a.articleBlockSmall")
             
             articles = []
             
             # Get page content
-            soup = BeautifulSoup(self.driver.html, 'html.parser')
+            root = parse(html)
             
             # Find the content list container
-            content_list = soup.find('div', {'class': 'contentList', 'id': 'filterAjax'})
+            content_list = root.select_one('div.contentList#filterAjax')
             if not content_list:
                 logging.error("Could not find content list container")
                 return []
             
             # Find all article blocks
-            article_blocks = content_list.find_all('a', {'class': 'item articleBlockSmall'})
+            article_blocks = content_list.select('a.item.articleBlockSmall')
             
             for block in article_blocks:
                 article = {}
@@ -100,23 +51,23 @@ class BanklessScraper:
                     article['url'] = self.base_url + article['url']
                     
                 # Extract metadata
-                content_span = block.find('span', {'class': 'content'})
+                content_span = block.select_one('span.content')
                 if content_span:
                     # Get title
-                    title_span = content_span.find('span', {'class': 'title'})
+                    title_span = content_span.select_one('span.title')
                     article['title'] = title_span.get_text().strip() if title_span else ''
                     
                     # Get subtitle/description
-                    subtitle_span = content_span.find('span', {'class': 'subTitle'})
+                    subtitle_span = content_span.select_one('span.subTitle')
                     article['description'] = subtitle_span.get_text().strip() if subtitle_span else ''
                     
                     # Get metadata (author, date, read time)
-                    meta_span = content_span.find('span', {'class': 'topMeta'})
+                    meta_span = content_span.select_one('span.topMeta')
                     if meta_span:
                         # Get author
-                        author_span = meta_span.find('span', {'class': 'author'})
-                        if author_span and author_span.find('strong'):
-                            article['author'] = author_span.find('strong').get_text().strip()
+                        author = meta_span.select_one('span.author strong')
+                        if author:
+                            article['author'] = author.get_text().strip()
                         
                         # Get publish date and read time from meta text
                         meta_text = meta_span.get_text().strip()
@@ -127,13 +78,13 @@ class BanklessScraper:
                             article['read_time'] = meta_parts[2].strip()
                     
                     # Get categories
-                    categories = content_span.find_all('span', {'class': 'category'})
+                    categories = content_span.select('span.category')
                     article['categories'] = [cat.get_text().strip() for cat in categories]
                 
                 # Get thumbnail image
-                image_span = block.find('span', {'class': 'image'})
-                if image_span and image_span.find('img'):
-                    article['thumbnail'] = image_span.find('img')['src']
+                image = block.select_one('span.image img')
+                if image:
+                    article['thumbnail'] = image['src']
                 
                 logging.info(f"Scraped: {article['title']}")
                 articles.append(article)
@@ -153,20 +104,27 @@ class BanklessScraper:
     def scrape_article_content(self, articles):
         """Scrape full content for each article"""
         logging.info(f"\nScraping content for {len(articles)} articles...")
+        urls = [article['url'] for article in articles]
+        pages = self.session.fetch_pages(self.base_url, urls)
+        
+        missing = [url for url in urls if not pages.get(url) or 'contents' not in pages[url]]
+        if missing:
+            try:
+                pages.update(self.session.browser_pages(self.base_url, missing, "#article .contents"))
+            except Exception as e:
+                logging.error(f"Browser fetch failed: {e}")
         
         for i, article in enumerate(articles):
             try:
                 logging.info(f"\nScraping article {i+1}/{len(articles)}: {article['title']}")
                 
-                # Access article page
-                self.driver.get(article['url'])
-                self.random_sleep(3, 5)
-                
-                # Parse content
-                soup = BeautifulSoup(self.driver.html, 'html.parser')
-                
                 # Find content container - updated selector
-                content_elem = soup.select_one('#article .contents')
+                html = pages.get(article['url'])
+                content_elem = parse(html).select_one('#article .contents') if html else None
+                if not content_elem and html and article['url'] not in missing:
+                    # HTTP page without the container: load it in the browser after all
+                    html = self.session.browser_html(self.base_url, article['url'], "#article .contents")
+                    content_elem = parse(html).select_one('#article .contents')
                 if not content_elem:
                     logging.info("Could not find content container")
                     continue
@@ -183,7 +141,6 @@ class BanklessScraper:
                 
                 # Save progress
                 self.save_articles(articles, filename="bankless_articles_full.json")
-                self.random_sleep(2, 4)
                 
             except Exception as e:
                 logging.error(f"Error scraping article content: {e}")
@@ -197,27 +154,21 @@ class BanklessScraper:
 
     def scrape(self):
         """Main scraping method"""
-        try:
-            if not self.init_driver():
-                logging.error("Failed to initialize driver")
-                return
-            
-            # Scrape article list
-            articles = self.scrape_articles()
-            if not articles:
-                logging.error("No articles found")
-                return
-            
-            # Scrape full content
-            self.scrape_article_content(articles)
-            
-        finally:
-            if self.driver:
-                self.driver.quit()
+        # Scrape article list (the browser starts only if the cached clearance is missing or challenged)
+        articles = self.scrape_articles()
+        if not articles:
+            logging.error("No articles found")
+            return
+        
+        # Scrape full content
+        self.scrape_article_content(articles)
 
 def main():
     scraper = BanklessScraper()
-    scraper.scrape()
+    try:
+        scraper.scrape()
+    finally:
+        shared_session.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,15 +1,39 @@
 import json
-import time
-import random
 import logging
-from CloudflareBypasser import CloudflareBypasser
-from DrissionPage import ChromiumPage, ChromiumOptions
-from bs4 import BeautifulSoup
+from page_parser import parse
+from readiness import Readiness
+from rate_limiter import domain_of
+from drission_session import shared_session
+from webflow import WebflowCollection
+from compact_doc import CompactDoc
+
+def legacy_content(document):
+    """The old per-element content list of an article, from its stored document"""
+    content = []
+    for block in CompactDoc.from_json(document).blocks():
+        if block.level:
+            continue
+        element_data = {'type': block.type, 'content': block.text}
+        if block.type == 'blockquote':
+            element_data['type'] = 'quote'
+        elif block.type in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
+            element_data['type'] = 'heading'
+            element_data['level'] = block.type[1]
+        elif block.type == 'img':
+            element_data['type'] = 'image'
+            element_data.update(block.attrs)
+        elif block.type in ['ul', 'ol']:
+            element_data['type'] = 'list'
+            element_data['items'] = [item.text for item in block.children]
+        content.append(element_data)
+    return content
 
 class BeaconsScraper:
-    def __init__(self):
+    def __init__(self, session=None):
         self.base_url = "https://beacons.ai"
         self.blog_url = f"{self.base_url}/i/beacons-blog"
+        self.session = session or shared_session
+        self.clearance = self.session.clearance
         self.driver = None
 
         # Configure logging
@@ -22,89 +46,42 @@ class BeaconsScraper:
             ]
         )
 
-    def random_sleep(self, min_seconds=2, max_seconds=5):
-        time.sleep(random.uniform(min_seconds, max_seconds))
-
-    def init_driver(self):
-        """Initialize ChromiumPage with proper options"""
+    def scrape_article_content(self, url, html=None):
+        """Scrape individual blog content, from already fetched HTML when it has the article"""
         try:
-            logging.info("Initializing driver...")
-            
-            # Configure Chrome options
-            options = ChromiumOptions().auto_port()
-            arguments = [
-                "-no-first-run",
-                "-force-color-profile=srgb",
-                "-metrics-recording-only",
-                "-password-store=basic",
-                "-use-mock-keychain",
-                "-export-tagged-pdf",
-                "-no-default-browser-check",
-                "-disable-background-mode",
-                "-enable-features=NetworkService,NetworkServiceInProcess",
-                "-disable-features=FlashDeprecationWarning",
-                "-disable-gpu",
-                "-accept-lang=en-US",
-            ]
-            
-            for argument in arguments:
-                options.set_argument(argument)
+            if not html or 'article_container' not in html:
+                html = self.session.browser_html(self.base_url, url, "div.article_container")
             
-            # Initialize driver
-            self.driver = ChromiumPage(addr_or_opts=options)
-            
-            # Access site and bypass Cloudflare
-            logging.info("Accessing site and bypassing Cloudflare...")
-            self.driver.get(self.base_url)
-            
-            cf_bypasser = CloudflareBypasser(self.driver)
-            cf_bypasser.bypass()
-            
-            logging.info("Successfully bypassed Cloudflare!")
-            self.random_sleep(3, 5)
-            
-            return True
-            
-        except Exception as e:
-            logging.error(f"Error initializing driver: {e}")
-            return False
-
-    def scrape_article_content(self, url):
-        """Scrape individual blog content"""
-        try:
-            self.driver.get(url)
-            self.random_sleep(3, 5)
-            
-            soup = BeautifulSoup(self.driver.html, 'html.parser')
+            root = parse(html)
             
             # Get article container
-            article_container = soup.find('div', {'class': 'article_container'})
+            article_container = root.select_one('div.article_container')
             if not article_container:
                 logging.info("Could not find article container")
                 return {}
             
             # Get header info
-            header = article_container.find('div', {'class': 'article_head'})
+            header = article_container.select_one('div.article_head')
             article_data = {}
             
             if header:
                 # Get metadata (date and category)
-                details = header.find('div', {'class': 'article_detailsblock'})
+                details = header.select_one('div.article_detailsblock')
                 if details:
-                    tags = details.find_all('div', {'class': 'article_tag'})
+                    tags = details.select('div.article_tag')
                     article_data['date'] = tags[0].text.strip() if tags else ""
                     article_data['category'] = tags[2].text.strip() if len(tags) > 2 else ""
                 
                 # Get title
-                title = header.find('h1', {'class': 'article_heading'})
+                title = header.select_one('h1.article_heading')
                 article_data['title'] = title.text.strip() if title else ""
                 
                 # Get author info
-                author_container = header.find('div', {'class': 'author_container'})
+                author_container = header.select_one('div.author_container')
                 if author_container:
-                    author_name = author_container.find('div', {'class': 'cu_author_name'})
-                    author_title = author_container.find('div', {'class': 'cu_author_title'})
-                    author_image = author_container.find('img', {'class': 'cu_author_image'})
+                    author_name = author_container.select_one('div.cu_author_name')
+                    author_title = author_container.select_one('div.cu_author_title')
+                    author_image = author_container.select_one('img.cu_author_image')
                     
                     article_data['author'] = {
                         'name': author_name.text.strip() if author_name else "",
@@ -113,50 +90,36 @@ class BeaconsScraper:
                     }
                 
                 # Get header image
-                masthead = header.find('div', {'class': 'article_masthead'})
+                masthead = header.select_one('div.article_masthead')
                 if masthead and 'style' in masthead.attrs:
                     image_url = masthead['style'].split('url("')[1].split('")')[0] if 'url(' in masthead['style'] else ""
                     article_data['header_image'] = image_url
             
             # Get main content
-            content_container = article_container.find('div', {'class': 'cu_article w-richtext'})
+            content_container = article_container.select_one('div.cu_article.w-richtext')
             if content_container:
-                # Extract structured content
-                content_elements = []
-                
+                # Blocks in one text buffer; lists hold their items as child blocks
+                document = CompactDoc()
                 for element in content_container.children:
-                    if element.name:  # Skip NavigableString objects
-                        element_data = {
-                            'type': element.name,
-                            'content': element.get_text(separator='\n').strip()
-                        }
-                        
-                        # Handle special elements
-                        if element.name == 'blockquote':
-                            element_data['type'] = 'quote'
-                        elif element.name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
-                            element_data['type'] = 'heading'
-                            element_data['level'] = element.name[1]
-                        elif element.name == 'img':
-                            element_data['type'] = 'image'
-                            element_data['src'] = element.get('src', '')
-                            element_data['alt'] = element.get('alt', '')
-                        elif element.name in ['ul', 'ol']:
-                            element_data['type'] = 'list'
-                            element_data['items'] = [li.text.strip() for li in element.find_all('li')]
-                        
-                        content_elements.append(element_data)
+                    attrs = {'src': element.get('src', ''), 'alt': element.get('alt', '')} if element.tag == 'img' else None
+                    if element.tag in ['ul', 'ol']:
+                        document.open(element.tag)
+                        for li in element.select('li'):
+                            document.add('li', li.text.strip())
+                        document.close()
+                    else:
+                        document.add(element.tag, element.get_text(separator='\n').strip(), attrs)
                 
-                article_data['content'] = content_elements
-                article_data['full_text'] = content_container.get_text(separator='\n').strip()
+                # content and full_text are rebuilt from it by legacy_content() and .text
+                article_data['document'] = document.to_json()
                 
                 # Get embedded media
-                embeds = content_container.find_all(['iframe', 'blockquote'])
+                embeds = content_container.select('iframe, blockquote')
                 if embeds:
                     article_data['embedded_media'] = [
                         {
-                            'type': 'video' if embed.name == 'iframe' else 'social',
-                            'src': embed.get('src', '') if embed.name == 'iframe' else embed.get('cite', '')
+                            'type': 'video' if embed.tag == 'iframe' else 'social',
+                            'src': embed.get('src', '') if embed.tag == 'iframe' else embed.get('cite', '')
                         } for embed in embeds
                     ]
             
@@ -166,12 +129,109 @@ class BeaconsScraper:
             logging.error(f"Error scraping article content: {e}")
             return {}
 
+    def parse_blog_item(self, item, page_url=None):
+        """Extract blog card metadata from a grid item"""
+        # Extract blog metadata
+        link_elem = item.select_one('a.blog_linkblock')
+        title_elem = item.select_one('div.blog_title')
+        
+        # Extract category and date from info wrapper
+        info_wrapper = item.select_one('div.blog-featured-card-infowrapper')
+        category_elem = info_wrapper.select_one('div.blog_category') if info_wrapper else None
+        date_elems = info_wrapper.select('div.blog_date') if info_wrapper else []
+        
+        # Get image URL from background-image style
+        image_elem = item.select_one('div.blog_cover_img')
+        image_url = ""
+        if image_elem and 'style' in image_elem.attrs:
+            style = image_elem['style']
+            if 'url(' in style:
+                image_url = style.split('url("')[1].split('")')[0]
+        
+        blog_data = {
+            "source": "Beacons",
+            "title": title_elem.text.strip() if title_elem else "",
+            "url": link_elem['href'] if link_elem else "",
+            "category": category_elem.text.strip() if category_elem else "",
+            "publication_date": date_elems[-1].text.strip() if date_elems else "",
+            "image": image_url
+        }
+        
+        # Make URL absolute if needed
+        if blog_data['url'] and not blog_data['url'].startswith('http'):
+            blog_data['url'] = self.base_url + blog_data['url']
+        
+        return blog_data
+
+    def list_blogs_paginated(self):
+        """List all blog cards through Webflow page URLs over HTTP, or None if that is blocked"""
+        try:
+            if not self.session.ensure_clearance(self.base_url):
+                return None
+            clearance = self.clearance.get(domain_of(self.base_url)) or {}
+            collection = WebflowCollection(
+                self.blog_url,
+                item_selector='div.grid_item.w-dyn-item',
+                parse_item=self.parse_blog_item,
+                user_agent=clearance.get('user_agent'),
+                cookies=clearance.get('cookies')
+            )
+            return collection.run()
+        except Exception as e:
+            logging.error(f"Paginated listing failed: {e}")
+            return None
+
     def scrape_blogs(self):
+        """Scrape all blogs, listing them via Webflow pagination when possible"""
+        blogs = self.list_blogs_paginated()
+        if not blogs:
+            logging.info("Webflow pagination unavailable, falling back to scrolling")
+            return self.scrape_blogs_by_scroll()
+        
+        logging.info(f"Found {len(blogs)} blogs via Webflow pagination")
+        urls = [blog['url'] for blog in blogs if blog['url']]
+        pages = self.session.fetch_pages(self.base_url, urls)
+        
+        missing = [url for url in urls if not pages.get(url) or 'article_container' not in pages[url]]
+        if missing:
+            try:
+                pages.update(self.session.browser_pages(self.base_url, missing, "div.article_container"))
+            except Exception as e:
+                logging.error(f"Browser fetch failed: {e}")
+        
+        all_blogs = []
+        for blog in blogs:
+            try:
+                blog_data = {"blog_id": len(all_blogs) + 1}
+                blog_data.update(blog)
+                
+                if blog_data['url']:
+                    logging.info(f"\nScraping blog {len(all_blogs)+1}: {blog_data['title']}")
+                    blog_data.update(self.scrape_article_content(blog_data['url'], pages.get(blog_data['url'])))
+                
+                all_blogs.append(blog_data)
+                
+                # Save progress periodically
+                if len(all_blogs) % 5 == 0:
+                    self.save_blogs(all_blogs)
+                    
+            except Exception as e:
+                logging.error(f"Error scraping blog: {str(e)}")
+                continue
+        
+        self.save_blogs(all_blogs)
+        logging.info(f"\nSuccessfully scraped {len(all_blogs)} blogs!")
+        return all_blogs
+
+    def scrape_blogs_by_scroll(self):
         """Scrape all blogs from the blog page including pagination"""
         try:
             logging.info("\nAccessing blog page...")
-            self.driver.get(self.blog_url)
-            self.random_sleep(3, 5)
+            if not self.session.ensure_bypassed(self.base_url):
+                raise RuntimeError("Failed to initialize driver")
+            # The listing keeps its own tab for scrolling while articles load on the others
+            self.driver = self.session.acquire()
+            self.session.html(self.driver, self.blog_url, "div.grid_item.w-dyn-item")
             
             all_blogs = []
             page = 1
@@ -183,16 +243,16 @@ class BeaconsScraper:
                 logging.info(f"\nScraping page {page}...")
                 
                 # Get page content
-                soup = BeautifulSoup(self.driver.html, 'html.parser')
+                root = parse(self.driver.html)
                 
                 # Find blog grid container
-                blog_grid = soup.find('div', {'class': 'grid w-dyn-items'})
+                blog_grid = root.select_one('div.grid.w-dyn-items')
                 if not blog_grid:
                     logging.error("Could not find blog grid container")
                     break
                 
                 # Find all blog items
-                blog_items = blog_grid.find_all('div', {'class': 'grid_item w-dyn-item'})
+                blog_items = blog_grid.select('div.grid_item.w-dyn-item')
                 current_item_count = len(blog_items)
                 
                 if not blog_items:
@@ -209,45 +269,20 @@ class BeaconsScraper:
                 
                 logging.info(f"Found {len(blog_items)} blogs on page {page}")
                 
-                # Process only new items
-                new_items = blog_items[last_item_count:]
+                # Process only new items, loading their articles in parallel
+                new_items = [self.parse_blog_item(item) for item in blog_items[last_item_count:]]
+                pages = self.session.browser_pages(self.base_url,
+                                                   [item['url'] for item in new_items if item['url']],
+                                                   "div.article_container")
                 for idx, item in enumerate(new_items, last_item_count + 1):
                     try:
-                        # Extract blog metadata
-                        link_elem = item.find('a', {'class': 'blog_linkblock'})
-                        title_elem = item.find('div', {'class': 'blog_title'})
-                        
-                        # Extract category and date from info wrapper
-                        info_wrapper = item.find('div', {'class': 'blog-featured-card-infowrapper'})
-                        category_elem = info_wrapper.find('div', {'class': 'blog_category'}) if info_wrapper else None
-                        date_elems = info_wrapper.find_all('div', {'class': 'blog_date'}) if info_wrapper else []
-                        
-                        # Get image URL from background-image style
-                        image_elem = item.find('div', {'class': 'blog_cover_img'})
-                        image_url = ""
-                        if image_elem and 'style' in image_elem.attrs:
-                            style = image_elem['style']
-                            if 'url(' in style:
-                                image_url = style.split('url("')[1].split('")')[0]
-                        
-                        blog_data = {
-                            "blog_id": len(all_blogs) + 1,
-                            "source": "Beacons",
-                            "title": title_elem.text.strip() if title_elem else "",
-                            "url": link_elem['href'] if link_elem else "",
-                            "category": category_elem.text.strip() if category_elem else "",
-                            "publication_date": date_elems[-1].text.strip() if date_elems else "",
-                            "image": image_url
-                        }
-                        
-                        # Make URL absolute if needed
-                        if blog_data['url'] and not blog_data['url'].startswith('http'):
-                            blog_data['url'] = self.base_url + blog_data['url']
+                        blog_data = {"blog_id": len(all_blogs) + 1}
+                        blog_data.update(item)
                         
                         # Get blog content
                         if blog_data['url']:
                             logging.info(f"\nScraping blog {len(all_blogs)+1}: {blog_data['title']}")
-                            content_data = self.scrape_article_content(blog_data['url'])
+                            content_data = self.scrape_article_content(blog_data['url'], pages.get(blog_data['url']))
                             blog_data.update(content_data)
                             
                         all_blogs.append(blog_data)
@@ -271,8 +306,12 @@ class BeaconsScraper:
                     });
                 """)
                 
-                # Wait for new content with timeout
-                self.random_sleep(5, 8)  # Longer wait for content load
+                # Wait for new items to render; a timeout is counted as a retry on the next pass
+                try:
+                    Readiness(selector="div.grid_item.w-dyn-item", min_count=current_item_count + 1,
+                              timeout=8000).wait_drission(self.driver)
+                except TimeoutError:
+                    logging.info("No new items rendered before timeout")
                 
                 page += 1
                 retry_count = 0  # Reset retry count after successful load
@@ -286,6 +325,11 @@ class BeaconsScraper:
         except Exception as e:
             logging.error(f"Error during scraping: {str(e)}")
             return []
+        
+        finally:
+            if self.driver:
+                self.session.release(self.driver)
+                self.driver = None
 
     def save_blogs(self, blogs, filename="beacons_blogs.json"):
         """Save blogs to JSON file"""
@@ -295,20 +339,15 @@ class BeaconsScraper:
 
     def scrape(self):
         """Main scraping method"""
-        try:
-            if not self.init_driver():
-                logging.error("Failed to initialize driver")
-                return
-            
-            self.scrape_blogs()
-            
-        finally:
-            if self.driver:
-                self.driver.quit()
+        # The browser starts only if the cached clearance is missing or challenged
+        self.scrape_blogs()
 
 def main():
     scraper = BeaconsScraper()
-    scraper.scrape()
+    try:
+        scraper.scrape()
+    finally:
+        shared_session.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,77 @@
+# Text of leaf blocks, read once each in document order. Text sitting directly in
+# containers (or in inline elements between blocks) is gathered into runs, so every
+# text node lands in exactly one block, however deeply the containers nest.
+BLOCK_TEXT_SCRIPT = """
+    (cfg) => {
+        const leaf = new Set(cfg.leaf);
+        const container = new Set(cfg.container);
+        const skip = new Set(cfg.skip);
+        const blocks = [];
+        let run = '';
+        const push = text => {
+            text = text.replace(/[ \\t\\u00a0]+/g, ' ').replace(/\\s*\\n\\s*/g, '\\n').trim();
+            if (text) blocks.push(text);
+        };
+        const flush = () => {
+            push(run);
+            run = '';
+        };
+        const walk = node => {
+            for (const child of node.childNodes) {
+                if (child.nodeType === Node.TEXT_NODE) {
+                    run += child.data;
+                    continue;
+                }
+                if (child.nodeType !== Node.ELEMENT_NODE) continue;
+                const tag = child.tagName.toLowerCase();
+                if (skip.has(tag) || child.hidden || child.getAttribute('aria-hidden') === 'true') continue;
+                if (tag === 'br') {
+                    run += '\\n';
+                } else if (leaf.has(tag)) {
+                    flush();
+                    push(child.innerText);
+                } else if (container.has(tag)) {
+                    flush();
+                    walk(child);
+                    flush();
+                } else {
+                    // Inline element: its text continues the current run
+                    walk(child);
+                }
+            }
+        };
+        const root = document.querySelector(cfg.root) || document.body;
+        walk(root);
+        flush();
+        return cfg.joined ? blocks.join('\\n\\n') : blocks;
+    }
+"""
+
+# Blocks whose whole text is taken in one piece
+LEAF_TAGS = ['p', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'pre', 'figcaption',
+             'td', 'th', 'dt', 'dd']
+# Blocks that are descended into; their direct text forms blocks of its own
+CONTAINER_TAGS = ['div', 'section', 'article', 'main', 'header', 'ul', 'ol', 'dl', 'table', 'thead',
+                  'tbody', 'tfoot', 'tr', 'figure', 'details', 'summary', 'hr']
+# Never part of an article's text
+SKIP_TAGS = ['nav', 'footer', 'aside', 'form', 'button', 'script', 'style', 'noscript', 'template',
+             'svg', 'iframe', 'select']
+
+
+class BlockText:
+    """Block-level text extraction rooted at a selector, for ArticleJob(script=BLOCK_TEXT_SCRIPT, arg=...)"""
+
+    def __init__(self, root=None, skip=None, joined=True):
+        self.root = root
+        self.skip = skip or SKIP_TAGS
+        # A single string with blocks separated by blank lines, or the list of blocks
+        self.joined = joined
+
+    def config(self):
+        return {
+            'root': self.root or 'body',
+            'leaf': LEAF_TAGS,
+            'container': CONTAINER_TAGS,
+            'skip': self.skip,
+            'joined': self.joined,
+        }
@@ -0,0 +1,186 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from contextlib import contextmanager, asynccontextmanager
+from page_archive import shared_archive
+
+STATE_FILE = "browser_service.json"
+DEFAULT_PORT = 9222
+# Not chrome_profile: that directory is tracked in the repo and a running browser rewrites it
+DEFAULT_PROFILE = "browser_service_profile"
+
+CHROME_ARGUMENTS = [
+    "--no-first-run",
+    "--force-color-profile=srgb",
+    "--metrics-recording-only",
+    "--password-store=basic",
+    "--use-mock-keychain",
+    "--export-tagged-pdf",
+    "--no-default-browser-check",
+    "--disable-background-mode",
+    "--enable-features=NetworkService,NetworkServiceInProcess",
+    "--disable-features=FlashDeprecationWarning",
+    "--disable-gpu",
+    "--accept-lang=en-US",
+]
+
+
+def load_state():
+    if not os.path.exists(STATE_FILE):
+        return None
+    with open(STATE_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def service_endpoint():
+    """Return the CDP websocket URL of the running service, or None"""
+    state = load_state()
+    if not state:
+        return None
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{state['port']}/json/version", timeout=1) as response:
+            return json.load(response)["webSocketDebuggerUrl"]
+    except Exception:
+        return None
+
+
+def service_address():
+    """Return host:port for DrissionPage to attach to, or None when the service is down"""
+    state = load_state()
+    if state and service_endpoint():
+        return f"127.0.0.1:{state['port']}"
+    return None
+
+
+def find_chrome():
+    if os.environ.get("CHROME_PATH"):
+        return os.environ["CHROME_PATH"]
+    from playwright.sync_api import sync_playwright
+    with sync_playwright() as p:
+        return p.chromium.executable_path
+
+
+def start(port=DEFAULT_PORT, profile=DEFAULT_PROFILE, headless=False):
+    if service_endpoint():
+        print(f"Browser service already running on port {load_state()['port']}")
+        return
+
+    command = [find_chrome(), f"--remote-debugging-port={port}",
+               f"--user-data-dir={os.path.abspath(profile)}"] + CHROME_ARGUMENTS
+    if headless:
+        command.append("--headless=new")
+
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               start_new_session=True)
+    with open(STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump({"pid": process.pid, "port": port, "profile": profile}, f, indent=2)
+
+    for _ in range(50):
+        if service_endpoint():
+            print(f"Browser service started on port {port} (pid {process.pid}, profile {profile})")
+            return
+        time.sleep(0.2)
+    print("Browser service did not come up; check the Chrome path and profile lock")
+
+
+def stop():
+    state = load_state()
+    if not state:
+        print("Browser service is not running")
+        return
+    try:
+        os.kill(state["pid"], signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+    os.remove(STATE_FILE)
+    print("Browser service stopped")
+
+
+def status():
+    endpoint = service_endpoint()
+    print(f"Browser service running at {endpoint}" if endpoint else "Browser service is not running")
+
+
+@contextmanager
+def open_browser(p, browser_type="chromium", headless=False, **context_options):
+    """Yield a browser context: the warm service's context when it is running, else a fresh launch
+
+    When attached, only the pages opened here are closed afterwards; the
+    browser, its HTTP cache and its cookies stay warm for the next run.
+    Documents, scripts and XHR responses the context loads go to the page
+    archive; with the archive offline, a fresh context is served from it only.
+    """
+    endpoint = None if shared_archive.offline else service_endpoint()
+    if endpoint:
+        print(f"Attached to warm browser service at {endpoint}")
+        browser = p.chromium.connect_over_cdp(endpoint)
+        context = browser.contexts[0] if browser.contexts else browser.new_context(**context_options)
+        existing_pages = set(context.pages)
+        recorder = shared_archive.record(context)
+        try:
+            yield context
+        finally:
+            # The service's context outlives this run, so its listener must not
+            context.remove_listener("response", recorder)
+            for page in context.pages:
+                if page not in existing_pages:
+                    page.close()
+    else:
+        browser = getattr(p, browser_type).launch(headless=headless)
+        try:
+            context = browser.new_context(**context_options)
+            if shared_archive.offline:
+                shared_archive.install(context)
+            else:
+                shared_archive.record(context)
+            yield context
+        finally:
+            browser.close()
+
+
+@asynccontextmanager
+async def open_browser_async(p, browser_type="chromium", headless=False, **context_options):
+    """Async counterpart of open_browser"""
+    endpoint = None if shared_archive.offline else service_endpoint()
+    if endpoint:
+        print(f"Attached to warm browser service at {endpoint}")
+        browser = await p.chromium.connect_over_cdp(endpoint)
+        context = browser.contexts[0] if browser.contexts else await browser.new_context(**context_options)
+        existing_pages = set(context.pages)
+        recorder = shared_archive.record_async(context)
+        try:
+            yield context
+        finally:
+            context.remove_listener("response", recorder)
+            for page in context.pages:
+                if page not in existing_pages:
+                    await page.close()
+    else:
+        browser = await getattr(p, browser_type).launch(headless=headless)
+        try:
+            context = await browser.new_context(**context_options)
+            if shared_archive.offline:
+                await shared_archive.install_async(context)
+            else:
+                shared_archive.record_async(context)
+            yield context
+        finally:
+            await browser.close()
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+    if command == "start":
+        start(headless="--headless" in sys.argv)
+    elif command == "stop":
+        stop()
+    else:
+        status()
+
+
+if __name__ == "__main__":
+    main()
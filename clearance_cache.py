@@ -0,0 +1,100 @@
+import asyncio
+import json
+import os
+import time
+from http_fetch import HttpFetcher, looks_like_challenge, DEFAULT_USER_AGENT
+from async_runner import run_sync
+from rate_limiter import shared_limiter, domain_of
+from page_archive import shared_archive
+
+CACHE_FILE = "clearance_cache.json"
+# Cloudflare's default clearance lifetime is 30 minutes; stay inside it
+DEFAULT_TTL = 25 * 60
+
+
+class ClearanceCache:
+    """Cloudflare clearance per domain: the session cookies (cf_clearance included) and the exact
+    user agent that earned them, kept on disk until they expire
+
+    cf_clearance is only honoured together with the user agent it was issued to,
+    so both are always stored and replayed together.
+    """
+
+    def __init__(self, path=CACHE_FILE, ttl=DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def get(self, domain):
+        """Return the unexpired clearance for a domain, or None"""
+        entry = self.entries.get(domain)
+        if entry and entry["expires"] > time.time():
+            return entry
+        return None
+
+    def put(self, domain, cookies, user_agent, expires=None):
+        now = time.time()
+        self.entries[domain] = {
+            "cookies": cookies,
+            "user_agent": user_agent,
+            "saved": now,
+            # The cookie's own expiry when it is sooner than our TTL
+            "expires": min(expires or now + self.ttl, now + self.ttl),
+        }
+        self.save()
+
+    def invalidate(self, domain):
+        if self.entries.pop(domain, None):
+            self.save()
+
+    async def fetch_async(self, urls, concurrency=4):
+        domain = domain_of(urls[0])
+        entry = self.get(domain)
+        if not entry:
+            if not shared_archive.offline:
+                return {}
+            # Replaying from the archive needs no clearance
+            entry = {"user_agent": DEFAULT_USER_AGENT, "cookies": {}}
+
+        slots = asyncio.Semaphore(concurrency)
+        challenged = []
+        async with HttpFetcher(max_connections=concurrency, user_agent=entry["user_agent"],
+                               cookies=entry["cookies"], rate_limiter=shared_limiter) as http:
+            async def fetch(url):
+                async with slots:
+                    try:
+                        status, html, _ = await http.get(url)
+                    except Exception as e:
+                        print(f"HTTP fetch failed for {url}: {str(e)}")
+                        return None
+                    if looks_like_challenge(status, html):
+                        challenged.append(url)
+                        return None
+                    return html if status < 400 else None
+
+            pages = await asyncio.gather(*(fetch(url) for url in urls))
+
+        if challenged:
+            # The challenge came back: the browser has to earn a fresh clearance
+            print(f"{len(challenged)} of {len(urls)} pages on {domain} were challenged")
+            self.invalidate(domain)
+        return dict(zip(urls, pages))
+
+    def fetch(self, urls, concurrency=4):
+        """Fetch pages of one domain over pooled HTTP with its cached clearance
+
+        Returns {url: html}, with None for pages that were challenged or failed,
+        and an empty dict when there is no valid clearance to use.
+        """
+        if not urls:
+            return {}
+        return run_sync(self.fetch_async(urls, concurrency))
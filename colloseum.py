@@ -1,27 +1,74 @@
 import json
-import time
-import random
+import os
+from urllib.parse import urljoin
+from page_parser import parse
 from playwright.sync_api import sync_playwright
+from browser_service import open_browser
+from article_pool import ArticlePool, ArticleJob
+from resource_policy import ResourcePolicy
+from ghost import GhostFeed
+from readiness import Readiness
+from scroll_harvester import ScrollHarvester
 
 class ColosseumScraper:
-    def __init__(self):
+    def __init__(self, concurrency=4, use_feed=True):
         self.base_url = "https://blog.colosseum.org"
+        self.use_feed = use_feed
+        self.content_api_key = os.environ.get("COLOSSEUM_GHOST_KEY")
+        self.resource_policy = ResourcePolicy()
+        self.pool = ArticlePool(browser_type="chromium", concurrency=concurrency, per_domain=concurrency, http_ok=True,
+                                resource_policy=self.resource_policy)
 
-    def random_sleep(self, min_seconds=2, max_seconds=5):
-        time.sleep(random.uniform(min_seconds, max_seconds))
+    def parse_article(self, html, url):
+        """Extract article content from server-rendered HTML (HTTP fetch path)"""
+        root = parse(html)
+        content = root.select_one('.article-content, .gh-content')
+        if not content:
+            return None
+        
+        return {
+            'content': content.get_text(separator='\n', strip=True),
+            'images': [
+                {'src': urljoin(url, img.get('src', '')), 'alt': img.get('alt', '')}
+                for img in root.select('.article-content img, .gh-content img')
+            ]
+        }
+
+    def scrape_feed(self):
+        posts = GhostFeed(self.base_url, content_api_key=self.content_api_key).run()
+        print(f"\nFound {len(posts)} articles in the feed")
+        
+        articles = [{
+            'title': post['title'],
+            'url': post['url'],
+            'excerpt': post['excerpt'],
+            'author': post['author'],
+            'date': post['date'],
+            'image': post['image'],
+            'content': post['content'],
+            'content_images': [{'src': img['src'], 'alt': img['alt']} for img in post['content_images']]
+        } for post in posts]
+        
+        with open("colosseum_articles.json", "w", encoding="utf-8") as f:
+            json.dump(articles, f, indent=2, ensure_ascii=False)
+        
+        print(f"\nSuccessfully scraped {len(articles)} articles!")
+        return articles
 
     def scrape_blogs(self):
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=False)
-            page = browser.new_page()
+        if self.use_feed:
+            return self.scrape_feed()
+        
+        with sync_playwright() as p, open_browser(p, "chromium") as context:
+            page = context.new_page()
+            self.resource_policy.install(page)
             
             try:
                 print(f"Accessing: {self.base_url}")
                 page.goto(self.base_url)
-                self.random_sleep(3)
                 
                 # Wait for content to load
-                page.wait_for_selector(".gh-feed", timeout=30000)
+                Readiness(selector=".gh-feed article").wait(page)
                 
                 # Click "See all" button if it exists
                 try:
@@ -29,71 +76,38 @@ class ColosseumScraper:
                     if see_all_button:
                         print("Clicking 'See all' button...")
                         see_all_button.click()
-                        self.random_sleep(3)
+                        Readiness(selector=".gh-feed article", network_idle=True).wait(page)
                 except Exception as e:
                     print(f"No 'See all' button found: {e}")
                 
-                # Scroll to load all content
+                # Scroll to load all content, collecting cards as they render
                 print("Loading all articles...")
-                last_height = 0
-                scroll_attempts = 0
-                max_attempts = 10
-                
-                while scroll_attempts < max_attempts:
-                    # Scroll down
-                    page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                    self.random_sleep(2)
-                    
-                    # Calculate new scroll height
-                    new_height = page.evaluate("document.body.scrollHeight")
-                    if new_height == last_height:
-                        break
-                    last_height = new_height
-                    scroll_attempts += 1
-                    print(f"Scrolling... (attempt {scroll_attempts}/{max_attempts})")
-
-                # Extract articles with updated selectors
-                articles = page.evaluate("""
-                    () => {
-                        const articles = [];
-                        document.querySelectorAll('.gh-feed article').forEach(article => {
-                            const link = article.querySelector('a.gh-card-link');
-                            const title = article.querySelector('.gh-card-title');
-                            const excerpt = article.querySelector('.gh-card-excerpt');
-                            const author = article.querySelector('.gh-card-author');
-                            const date = article.querySelector('.gh-card-date');
-                            const image = article.querySelector('img');
-                            
-                            if (title && link) {
-                                articles.push({
-                                    title: title.innerText.trim(),
-                                    url: link.href,
-                                    excerpt: excerpt ? excerpt.innerText.trim() : '',
-                                    author: author ? author.innerText.replace('By ', '').trim() : '',
-                                    date: date ? date.getAttribute('datetime') : '',
-                                    image: image ? image.src : null
-                                });
-                            }
-                        });
-                        return articles;
+                articles = ScrollHarvester('.gh-feed article', rate_limiter=self.pool.rate_limiter, extract="""
+                    article => {
+                        const link = article.querySelector('a.gh-card-link');
+                        const title = article.querySelector('.gh-card-title');
+                        const excerpt = article.querySelector('.gh-card-excerpt');
+                        const author = article.querySelector('.gh-card-author');
+                        const date = article.querySelector('.gh-card-date');
+                        const image = article.querySelector('img');
+                        
+                        if (!title || !link) return null;
+                        return {
+                            title: title.innerText.trim(),
+                            url: link.href,
+                            excerpt: excerpt ? excerpt.innerText.trim() : '',
+                            author: author ? author.innerText.replace('By ', '').trim() : '',
+                            date: date ? date.getAttribute('datetime') : '',
+                            image: image ? image.src : null
+                        };
                     }
-                """)
+                """).harvest(page)
                 
                 print(f"\nFound {len(articles)} articles")
                 
                 # Now scrape individual articles with correct selectors
-                for idx, article in enumerate(articles, 1):
-                    try:
-                        print(f"\nScraping article {idx}/{len(articles)}")
-                        print(f"URL: {article['url']}")
-                        
-                        page.goto(article['url'])
-                        # Wait for the main article content with updated selector
-                        page.wait_for_selector('.article-content, .gh-content', timeout=30000)
-                        self.random_sleep(2)
-                        
-                        # Extract article content with updated selectors
-                        content_data = page.evaluate("""
+                jobs = [ArticleJob(article['url'], wait_for='.article-content, .gh-content', error_name=f"error_{idx}",
+                                   parse=self.parse_article, script="""
                             () => {
                                 const content = document.querySelector('.article-content, .gh-content');
                                 const images = Array.from(document.querySelectorAll('.article-content img, .gh-content img')).map(img => ({
@@ -106,23 +120,22 @@ class ColosseumScraper:
                                     images: images
                                 };
                             }
-                        """)
-                        
-                        article['content'] = content_data['content']
-                        article['content_images'] = content_data['images']
-                        
-                        print(f"Successfully scraped: {article['title']}")
-                        
-                        # Save progress after each article
-                        with open("colosseum_articles.json", "w", encoding="utf-8") as f:
-                            json.dump(articles, f, indent=2, ensure_ascii=False)
-                        
-                        self.random_sleep(2)
-                        
-                    except Exception as e:
-                        print(f"Error scraping article: {str(e)}")
-                        page.screenshot(path=f"error_{idx}.png")
-                        continue
+                        """) for idx, article in enumerate(articles, 1)]
+                
+                def save_article(idx, content_data):
+                    if not content_data:
+                        return
+                    article = articles[idx]
+                    article['content'] = content_data['content']
+                    article['content_images'] = content_data['images']
+                    print(f"Successfully scraped: {article['title']}")
+                    
+                    # Save progress after each article
+                    with open("colosseum_articles.json", "w", encoding="utf-8") as f:
+                        json.dump(articles, f, indent=2, ensure_ascii=False)
+                
+                print(f"Scraping {len(jobs)} articles with {self.pool.concurrency} tabs...")
+                self.pool.run(jobs, on_result=save_article)
                 
                 print(f"\nSuccessfully scraped {len(articles)} articles!")
                 
@@ -134,7 +147,7 @@ class ColosseumScraper:
                 print("Saved error.png and error.html for debugging")
                 
             finally:
-                browser.close()
+                page.close()
 
 def main():
     scraper = ColosseumScraper()
@@ -0,0 +1,203 @@
+import sys
+from array import array
+
+
+class Block:
+    """One row of a CompactDoc's block table; its text is sliced from the buffer on access"""
+
+    __slots__ = ('doc', 'index')
+
+    def __init__(self, doc, index):
+        self.doc = doc
+        self.index = index
+
+    def _row(self, column):
+        return self.doc.table[self.index * 4 + column]
+
+    @property
+    def type(self):
+        return self.doc.types[self._row(0)]
+
+    @property
+    def level(self):
+        return self._row(1)
+
+    @property
+    def start(self):
+        return self._row(2)
+
+    @property
+    def end(self):
+        return self._row(3)
+
+    @property
+    def text(self):
+        return self.doc.text[self.start:self.end]
+
+    @property
+    def attrs(self):
+        return self.doc.attrs.get(self.index, {})
+
+    @property
+    def children(self):
+        """Blocks directly inside this one; they follow it in the table one level deeper"""
+        level = self.level
+        for block in self.doc.blocks(start=self.index + 1):
+            if block.level <= level:
+                break
+            if block.level == level + 1:
+                yield block
+
+
+class CompactDoc:
+    """A structured article stored once: one text buffer plus a block table
+
+    Each block is a (type, level, start, end) row of ints: type indexes the
+    interned `types`, level is the nesting depth and start/end are offsets into
+    the buffer. Containers (lists, quotes with paragraphs) precede their
+    children and span them, so a list's text is never stored beside its items.
+    Blocks are separated by a blank line at the top level and by a newline
+    inside containers, which makes the buffer itself the article's full text.
+    """
+
+    def __init__(self):
+        self.types = []
+        self.type_ids = {}
+        self._table = array('l')
+        # block index -> extra attributes (image src/alt and the like)
+        self.attrs = {}
+        self.parts = []
+        self.length = 0
+        self._text = None
+        self._blocks = None
+        # Open containers while building; a container's first child needs no separator
+        self.stack = []
+        self.fresh = False
+
+    # Building
+
+    def type_id(self, name):
+        if name not in self.type_ids:
+            self.type_ids[name] = len(self.types)
+            self.types.append(sys.intern(name))
+        return self.type_ids[name]
+
+    def _append(self, text):
+        self.parts.append(text)
+        self.length += len(text)
+        self._text = None
+
+    def _row(self, name, attrs):
+        index = len(self)
+        self.table.extend((self.type_id(name), len(self.stack), self.length, self.length))
+        if attrs:
+            self.attrs[index] = attrs
+        return index
+
+    def _separate(self):
+        if self.length and not self.fresh:
+            self._append('\n' if self.stack else '\n\n')
+        self.fresh = False
+
+    def add(self, name, text='', attrs=None):
+        """Append a leaf block; empty blocks (images) take no room in the buffer"""
+        if text:
+            self._separate()
+        index = self._row(name, attrs)
+        self._append(text)
+        self.table[index * 4 + 3] = self.length
+        return index
+
+    def open(self, name, attrs=None):
+        """Start a container; blocks added until close() are its children"""
+        self._separate()
+        index = self._row(name, attrs)
+        self.stack.append(index)
+        self.fresh = True
+        return index
+
+    def close(self):
+        index = self.stack.pop()
+        self.table[index * 4 + 3] = self.length
+        self.fresh = False
+
+    def extend(self, nodes):
+        """Add a tree of {'type', 'text' or 'children', 'attrs'} dicts, as extraction scripts return it"""
+        for node in nodes:
+            if 'children' in node:
+                self.open(node['type'], node.get('attrs'))
+                self.extend(node['children'])
+                self.close()
+            else:
+                self.add(node['type'], node.get('text') or '', node.get('attrs'))
+        return self
+
+    @classmethod
+    def from_tree(cls, nodes):
+        return cls().extend(nodes)
+
+    # Storage
+
+    def to_json(self):
+        data = {
+            'text': self.text,
+            'types': self.types,
+            # One string of ints instead of a list of rows, which an indented dump spreads over lines
+            'blocks': ' '.join(map(str, self.table)),
+        }
+        if self.attrs:
+            data['attrs'] = {str(index): attrs for index, attrs in self.attrs.items()}
+        return data
+
+    @classmethod
+    def from_json(cls, data):
+        """Load a stored document; the block table is only decoded when blocks are first read"""
+        doc = cls()
+        doc._text = data['text']
+        doc.parts = [doc._text]
+        doc.length = len(doc._text)
+        doc.types = [sys.intern(name) for name in data['types']]
+        doc.type_ids = {name: index for index, name in enumerate(doc.types)}
+        doc._blocks = data['blocks']
+        doc._table = None
+        doc.attrs = {int(index): attrs for index, attrs in data.get('attrs', {}).items()}
+        return doc
+
+    # Reading
+
+    @property
+    def text(self):
+        """The whole buffer, i.e. the article's full text"""
+        if self._text is None:
+            self._text = ''.join(self.parts)
+            self.parts = [self._text]
+        return self._text
+
+    @property
+    def table(self):
+        if self._table is None:
+            self._table = array('l', map(int, self._blocks.split()))
+            self._blocks = None
+        return self._table
+
+    def __len__(self):
+        return len(self.table) // 4
+
+    def block(self, index):
+        return Block(self, index)
+
+    def blocks(self, name=None, start=0):
+        """Blocks in document order, optionally only those of one type"""
+        for index in range(start, len(self)):
+            block = Block(self, index)
+            if name is None or block.type == name:
+                yield block
+
+    def structured_content(self):
+        """Every block as {'type', 'text'}, containers included (the old Chain of Thought field)
+
+        A container's text spans its children. Loose text inside it (an <li>'s own words
+        beside a nested list) is kept as a 'text' block among the container's children, so a
+        reader of leaf blocks still sees it.
+        """
+        return [{'type': block.type, 'text': block.text} for block in self.blocks()]
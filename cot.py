@@ -1,14 +1,54 @@
 import json
-import time
-import random
+from urllib.parse import urljoin
 from playwright.sync_api import sync_playwright
+from browser_service import open_browser
+from article_pool import ArticlePool, ArticleJob
+from resource_policy import ResourcePolicy
+from webflow import WebflowCollection
+from readiness import Readiness
+from compact_doc import CompactDoc
 
 class ChainOfThoughtScraper:
-    def __init__(self):
+    def __init__(self, concurrency=4):
         self.base_url = "https://www.chainofthought.co"
+        self.resource_policy = ResourcePolicy()
+        self.pool = ArticlePool(browser_type="chromium", concurrency=concurrency, per_domain=concurrency,
+                                resource_policy=self.resource_policy)
 
-    def random_sleep(self, min_seconds=2, max_seconds=5):
-        time.sleep(random.uniform(min_seconds, max_seconds))
+    def parse_card(self, item, page_url, section_name):
+        link = item.select_one('a.blog-item')
+        title = item.select_one('.blog-title')
+        if not (title and link):
+            return None
+        
+        description = item.select_one('.blog-description, .blog-description-copy')
+        date = item.select_one('.blog-date')
+        author = item.select_one('.blog-author')
+        image = item.select_one('img.blog-image')
+        
+        return {
+            'title': title.get_text(strip=True),
+            'url': urljoin(page_url, link.get('href', '')),
+            'description': description.get_text(strip=True) if description else '',
+            'date': date.get_text(strip=True) if date else '',
+            'author': author.get_text(strip=True).replace('By ', '').strip() if author else '',
+            'image': urljoin(page_url, image['src']) if image and image.get('src') else None,
+            'section': section_name
+        }
+
+    def scrape_section_http(self, section_data):
+        """Fetch every page of a section over HTTP, or None when it needs the browser"""
+        section_id, section_name, item_class = section_data
+        collection = WebflowCollection(
+            f"{self.base_url}/research",
+            item_selector=f".{item_class}",
+            scope=f"div[data-w-id='{section_id}']",
+            parse_item=lambda item, page_url: self.parse_card(item, page_url, section_name)
+        )
+        articles = collection.run()
+        if articles is not None:
+            print(f"Found {len(articles)} articles in {section_name} over HTTP")
+        return articles
 
     def scrape_section(self, page, section_data):
         section_id, section_name, item_class = section_data
@@ -21,8 +61,7 @@ class ChainOfThoughtScraper:
             try:
                 # Wait for section content to load
                 section_selector = f"div[data-w-id='{section_id}']"
-                page.wait_for_selector(f"{section_selector} .w-dyn-items", timeout=30000)
-                self.random_sleep(2)
+                Readiness(selector=f"{section_selector} .w-dyn-items").wait(page)
                 
                 # Extract articles from current page
                 new_articles = page.evaluate("""
@@ -70,8 +109,7 @@ class ChainOfThoughtScraper:
                 if next_button.count() > 0 and next_button.is_visible():
                     next_button.click()
                     page_num += 1
-                    self.random_sleep(3)
-                    page.wait_for_load_state('networkidle')
+                    Readiness(network_idle=True).wait(page)
                 else:
                     break
                     
@@ -82,14 +120,12 @@ class ChainOfThoughtScraper:
                 
         return articles
 
-    def scrape_article_content(self, page, url):
-        try:
-            page.goto(url)
-            # Wait for the main article content container
-            page.wait_for_selector('.w-richtext', timeout=30000)
-            self.random_sleep(2)
-            
-            return page.evaluate("""
+    def article_job(self, url):
+        return ArticleJob(
+            url,
+            wait_for='.w-richtext',
+            error_name=f"error_article_{url.split('/')[-1]}",
+            script="""
                 () => {
                     // Get the main content container
                     const content = document.querySelector('.w-richtext');
@@ -107,35 +143,57 @@ class ChainOfThoughtScraper:
                         author: document.querySelector('.blog-author')?.innerText.trim() || ''
                     };
                     
-                    // Get all text content including headers and paragraphs
-                    const textContent = Array.from(content.querySelectorAll('h1, h2, h3, h4, h5, h6, p, ul, ol, li, blockquote')).map(el => ({
-                        type: el.tagName.toLowerCase(),
-                        text: el.innerText.trim()
-                    }));
+                    // Blocks as a tree: lists and quotes holding blocks become containers of them,
+                    // so every piece of text is returned once (see compact_doc.CompactDoc)
+                    const selector = 'h1, h2, h3, h4, h5, h6, p, ul, ol, li, blockquote';
+                    const blockTags = new Set(selector.split(', '));
+                    const walk = (el, inBlock) => {
+                        const nodes = [];
+                        let run = '';
+                        const flush = () => {
+                            const text = run.trim();
+                            if (text) nodes.push({ type: 'text', text });
+                            run = '';
+                        };
+                        for (const child of el.childNodes) {
+                            if (child.nodeType === Node.TEXT_NODE) {
+                                // Text sitting directly in a container, next to its blocks
+                                if (inBlock) run += child.data;
+                                continue;
+                            }
+                            if (child.nodeType !== Node.ELEMENT_NODE) continue;
+                            const type = child.tagName.toLowerCase();
+                            const nested = child.querySelector(selector);
+                            if (!blockTags.has(type)) {
+                                if (nested) {
+                                    flush();
+                                    nodes.push(...walk(child, inBlock));
+                                } else if (inBlock) {
+                                    run += child.innerText;
+                                }
+                                continue;
+                            }
+                            flush();
+                            nodes.push(nested ? { type, children: walk(child, true) } : { type, text: child.innerText.trim() });
+                        }
+                        flush();
+                        return nodes;
+                    };
                     
                     return {
                         metadata: metadata,
-                        content: content ? content.innerText.trim() : '',
-                        structured_content: textContent,
+                        document: content ? walk(content, false) : [],
                         images: images
                     };
                 }
-            """)
-        except Exception as e:
-            print(f"Error scraping article content: {str(e)}")
-            # Save error screenshot and HTML for debugging
-            page.screenshot(path=f"error_article_{url.split('/')[-1]}.png")
-            with open(f"error_article_{url.split('/')[-1]}.html", "w", encoding="utf-8") as f:
-                f.write(page.content())
-            return None
+            """
+        )
 
     def scrape_all_content(self):
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=False)
-            context = browser.new_context(
-                viewport={'width': 1920, 'height': 1080}
-            )
+        with sync_playwright() as p, \
+                open_browser(p, "chromium", viewport={'width': 1920, 'height': 1080}) as context:
             page = context.new_page()
+            self.resource_policy.install(page)
             
             try:
                 all_articles = []
@@ -143,7 +201,7 @@ class ChainOfThoughtScraper:
                 # Go to research page
                 print("\nAccessing research page...")
                 page.goto(f"{self.base_url}/research")
-                self.random_sleep(3)
+                Readiness(selector=".w-dyn-items").wait(page)
                 
                 # Define sections with their exact IDs and classes
                 sections = [
@@ -152,10 +210,12 @@ class ChainOfThoughtScraper:
                     ('ee6e2cf9-5d53-5a62-f979-a79c0d1481b2', 'Weekly Newsletter', 'collection-item-5')
                 ]
                 
-                # Scrape each section
+                # Scrape each section, paging over HTTP where the site allows it
                 for section_data in sections:
                     print(f"\nScraping {section_data[1]} section...")
-                    section_articles = self.scrape_section(page, section_data)
+                    section_articles = self.scrape_section_http(section_data)
+                    if section_articles is None:
+                        section_articles = self.scrape_section(page, section_data)
                     all_articles.extend(section_articles)
                 
                 print(f"\nFound total of {len(all_articles)} articles")
@@ -164,31 +224,25 @@ class ChainOfThoughtScraper:
                 with open("cot_articles_list.json", "w", encoding="utf-8") as f:
                     json.dump(all_articles, f, indent=2, ensure_ascii=False)
                 
-                # Scrape full content for each article
-                for idx, article in enumerate(all_articles, 1):
-                    try:
-                        print(f"\nScraping article {idx}/{len(all_articles)}")
-                        print(f"URL: {article['url']}")
-                        
-                        content_data = self.scrape_article_content(page, article['url'])
-                        if content_data:
-                            article.update({
-                                'full_content': content_data['content'],
-                                'structured_content': content_data['structured_content'],
-                                'content_images': content_data['images'],
-                                'metadata': content_data['metadata']
-                            })
-                            print(f"Successfully scraped: {article['title']}")
-                        
-                        # Save progress after each article
-                        with open("cot_articles_full.json", "w", encoding="utf-8") as f:
-                            json.dump(all_articles, f, indent=2, ensure_ascii=False)
-                        
-                        self.random_sleep(2)
-                        
-                    except Exception as e:
-                        print(f"Error scraping article: {str(e)}")
-                        continue
+                # Scrape full content for all articles over the tab pool
+                def save_article(idx, content_data):
+                    article = all_articles[idx]
+                    if content_data:
+                        article.update({
+                            # full_content and structured_content are CompactDoc.from_json(...).text
+                            # and .structured_content()
+                            'document': CompactDoc.from_tree(content_data['document']).to_json(),
+                            'content_images': content_data['images'],
+                            'metadata': content_data['metadata']
+                        })
+                        print(f"Successfully scraped: {article['title']}")
+                    
+                    # Save progress after each article
+                    with open("cot_articles_full.json", "w", encoding="utf-8") as f:
+                        json.dump(all_articles, f, indent=2, ensure_ascii=False)
+                
+                print(f"\nScraping {len(all_articles)} articles with {self.pool.concurrency} tabs...")
+                self.pool.run([self.article_job(article['url']) for article in all_articles], on_result=save_article)
                 
                 print(f"\nSuccessfully scraped {len(all_articles)} articles!")
                 
@@ -200,7 +254,7 @@ class ChainOfThoughtScraper:
                 print("Saved error.png and error.html for debugging")
                 
             finally:
-                browser.close()
+                page.close()
 
 def main():
     scraper = ChainOfThoughtScraper()
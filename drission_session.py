@@ -0,0 +1,222 @@
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from CloudflareBypasser import CloudflareBypasser
+from DrissionPage import ChromiumPage, ChromiumOptions
+from readiness import Readiness
+from resource_policy import ResourcePolicy
+from browser_service import service_address
+from http_fetch import looks_like_challenge
+from rate_limiter import shared_limiter, domain_of
+from clearance_cache import ClearanceCache
+from page_archive import shared_archive
+
+# Launch arguments shared by every DrissionPage scraper
+CHROME_ARGUMENTS = [
+    "-no-first-run",
+    "-force-color-profile=srgb",
+    "-metrics-recording-only",
+    "-password-store=basic",
+    "-use-mock-keychain",
+    "-export-tagged-pdf",
+    "-no-default-browser-check",
+    "-disable-background-mode",
+    "-enable-features=NetworkService,NetworkServiceInProcess",
+    "-disable-features=FlashDeprecationWarning",
+    "-disable-gpu",
+    "-accept-lang=en-US",
+]
+
+
+class DrissionSession:
+    """One Chromium shared by the DrissionPage scrapers, bypassing Cloudflare once per domain
+    and handing out a pool of tabs that all carry the earned clearance
+
+    The browser starts on first need; tabs are opened lazily up to `tabs` and
+    reused, so article pages can be loaded in parallel from worker threads.
+    A caller holding a tab of its own (e.g. a scrolled listing) needs tabs >= 2.
+    """
+
+    def __init__(self, tabs=4, resource_policy=None, rate_limiter=None, clearance=None, archive=None):
+        self.tabs = tabs
+        self.resource_policy = resource_policy or ResourcePolicy()
+        self.rate_limiter = rate_limiter or shared_limiter
+        # Cloudflare clearance shared with plain HTTP fetches
+        self.clearance = clearance or ClearanceCache()
+        # Loaded pages are archived; an offline archive answers instead of the browser
+        self.archive = archive or shared_archive
+        self.page = None
+        # True when driving the warm browser service, which must outlive this run
+        self.attached = False
+        self.bypassed = set()
+        self.idle = queue.Queue()
+        self.opened = []
+        # Serialises browser start, bypasses and clearance writes across tab threads
+        self.lock = threading.RLock()
+
+    def start(self):
+        """Launch Chromium, or attach to the warm browser service when it is running"""
+        logging.info("Initializing driver...")
+        options = ChromiumOptions().auto_port()
+        for argument in CHROME_ARGUMENTS:
+            options.set_argument(argument)
+
+        address = service_address()
+        if address:
+            logging.info(f"Attaching to warm browser service at {address}")
+            options = ChromiumOptions().set_address(address)
+            self.attached = True
+
+        self.page = ChromiumPage(addr_or_opts=options)
+
+    def solve(self, tab):
+        """Run the challenge on a tab and export the clearance it earns"""
+        with self.lock:
+            cf_bypasser = CloudflareBypasser(tab)
+            result = cf_bypasser.bypass()
+            if result.success:
+                cf_bypasser.export_clearance(self.clearance)
+            return result
+
+    def ensure_bypassed(self, url):
+        """Start the browser if needed and pass the challenge for the URL's domain, once per session"""
+        if self.archive.offline:
+            return True
+        domain = domain_of(url)
+        with self.lock:
+            if domain in self.bypassed:
+                return True
+            try:
+                if self.page is None:
+                    self.start()
+
+                logging.info(f"Accessing {domain} and bypassing Cloudflare...")
+                self.page.get(url)
+                result = self.solve(self.page)
+                if not result.success:
+                    logging.error(f"Cloudflare bypass failed: {result.as_dict()}")
+                    return False
+                logging.info("Successfully bypassed Cloudflare!")
+
+                # Block heavy resources only once the challenge no longer needs them
+                self.resource_policy.install_drission(self.page)
+                logging.info(f"Blocking {len(self.resource_policy.blocked_url_patterns())} URL patterns")
+                Readiness().wait_drission(self.page)
+                self.bypassed.add(domain)
+                return True
+
+            except Exception as e:
+                logging.error(f"Error initializing driver: {e}")
+                return False
+
+    def ensure_clearance(self, url):
+        """True once the URL's domain has a clearance, earning one in the browser if none is cached"""
+        return bool(self.clearance.get(domain_of(url))) or self.ensure_bypassed(url)
+
+    def acquire(self):
+        """Take an idle tab, opening a new one while the pool is below its size"""
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            if len(self.opened) < self.tabs:
+                tab = self.page.new_tab()
+                self.resource_policy.install_drission(tab)
+                self.opened.append(tab)
+                return tab
+        return self.idle.get()
+
+    def release(self, tab):
+        self.idle.put(tab)
+
+    def get(self, tab, url):
+        """Open a URL in a tab, paced by the shared rate limiter and reporting back how it went"""
+        domain = domain_of(url)
+        self.rate_limiter.acquire_sync(domain)
+        started = time.monotonic()
+        try:
+            tab.get(url)
+        except Exception:
+            self.rate_limiter.report(domain, error=True)
+            raise
+        challenge = looks_like_challenge(None, tab.title)
+        self.rate_limiter.report(domain, latency=time.monotonic() - started, challenge=challenge)
+        if challenge:
+            logging.info("Challenge reappeared, solving it in the browser")
+            result = self.solve(tab)
+            logging.info(f"Challenge result: {result.as_dict()}")
+
+    def html(self, tab, url, selector):
+        self.get(tab, url)
+        Readiness(selector=selector).wait_drission(tab)
+        html = tab.html
+        self.archive.put(url, html)
+        return html
+
+    def fetch_many(self, urls, selector):
+        """Load pages in parallel over the tab pool and return {url: html}, None for failures
+
+        The domain must already have been bypassed with ensure_bypassed.
+        """
+        def fetch(url):
+            tab = self.acquire()
+            try:
+                return self.html(tab, url, selector)
+            except Exception as e:
+                logging.error(f"Browser fetch failed for {url}: {e}")
+                return None
+            finally:
+                self.release(tab)
+
+        if not urls:
+            return {}
+        if self.archive.offline:
+            return {url: self.archive.get(url) for url in urls}
+        with ThreadPoolExecutor(max_workers=min(self.tabs, len(urls))) as pool:
+            pages = dict(zip(urls, pool.map(fetch, urls)))
+        logging.info(f"Fetched {sum(1 for html in pages.values() if html)} of {len(urls)} pages in the browser")
+        return pages
+
+    def fetch_pages(self, base_url, urls):
+        """Fetch a site's pages over pooled HTTP with the cached clearance; the browser is only
+        started to earn or renew one"""
+        if not self.ensure_clearance(base_url):
+            return {}
+        pages = self.clearance.fetch(urls)
+        logging.info(f"Fetched {sum(1 for html in pages.values() if html)} of {len(urls)} pages over HTTP")
+        return pages
+
+    def browser_pages(self, base_url, urls, selector):
+        """Load a site's pages in parallel on the tabs, for when HTTP was challenged or lacked the content"""
+        if not self.ensure_bypassed(base_url):
+            raise RuntimeError("Failed to initialize driver")
+        return self.fetch_many(urls, selector)
+
+    def browser_html(self, base_url, url, selector):
+        html = self.browser_pages(base_url, [url], selector).get(url)
+        if not html:
+            raise RuntimeError(f"Failed to load {url} in the browser")
+        return html
+
+    def close(self):
+        """Close the pooled tabs, and the browser unless it belongs to the warm service"""
+        if self.page is None:
+            return
+        for tab in self.opened:
+            try:
+                tab.close()
+            except Exception:
+                pass
+        if not self.attached:
+            self.page.quit()
+        self.page = None
+        self.opened = []
+        self.idle = queue.Queue()
+        self.bypassed = set()
+
+
+# One browser for every DrissionPage scraper in the process
+shared_session = DrissionSession()
@@ -0,0 +1,171 @@
+import asyncio
+import math
+import xml.etree.ElementTree as ET
+from email.utils import parsedate_to_datetime
+from urllib.parse import urljoin
+from page_parser import parse
+from http_fetch import HttpFetcher
+from async_runner import run_sync
+from rate_limiter import shared_limiter
+
+RSS_NAMESPACES = {
+    "content": "http://purl.org/rss/1.0/modules/content/",
+    "dc": "http://purl.org/dc/elements/1.1/",
+    "media": "http://search.yahoo.com/mrss/",
+}
+
+# Ghost estimates reading time at 275 words per minute
+WORDS_PER_MINUTE = 275
+
+
+class GhostFeed:
+    """Reads posts from a Ghost site through the Content API, or its public RSS feed without a key"""
+
+    def __init__(self, base_url, tag=None, content_api_key=None, page_size=50, concurrency=4):
+        self.base_url = base_url.rstrip('/')
+        self.tag = tag
+        # Content API key from the site's Ghost admin (Integrations); the public RSS feed is read without one
+        self.content_api_key = content_api_key
+        self.page_size = page_size
+        self.concurrency = concurrency
+
+    def post_record(self, title, url, excerpt, date, html, image=None, author='', tags=None,
+                    reading_time=None):
+        """Build the common post dict, deriving text and images from the HTML body"""
+        root = parse(html or '')
+        content = root.get_text(separator='\n', strip=True)
+        if not reading_time:
+            reading_time = max(1, math.ceil(len(content.split()) / WORDS_PER_MINUTE))
+
+        return {
+            "title": title.strip(),
+            "url": url,
+            "excerpt": (excerpt or '').strip(),
+            "date": date,
+            "read_time": f"{reading_time} min read",
+            "image": image,
+            "author": author,
+            "tags": tags or [],
+            "html": html or '',
+            "content": content,
+            "content_images": [{
+                "src": urljoin(url, img.get('src', '')),
+                "alt": img.get('alt', ''),
+                "width": img.get('width', ''),
+                "height": img.get('height', '')
+            } for img in root.select('img')]
+        }
+
+    # Content API
+
+    def _api_params(self, page):
+        params = {
+            "key": self.content_api_key,
+            "limit": self.page_size,
+            "page": page,
+            "include": "tags,authors",
+            "formats": "html"
+        }
+        if self.tag:
+            params["filter"] = f"tag:{self.tag}"
+        return params
+
+    def _api_record(self, post):
+        return self.post_record(
+            title=post.get("title") or '',
+            url=post.get("url") or '',
+            excerpt=post.get("custom_excerpt") or post.get("excerpt"),
+            date=(post.get("published_at") or '')[:10],
+            html=post.get("html"),
+            image=post.get("feature_image"),
+            author=(post.get("primary_author") or {}).get("name", ''),
+            tags=[tag["name"] for tag in post.get("tags") or []],
+            reading_time=post.get("reading_time")
+        )
+
+    async def _fetch_api(self, http):
+        endpoint = f"{self.base_url}/ghost/api/content/posts/"
+        first = await http.get_json(endpoint, params=self._api_params(1))
+        pages = first["meta"]["pagination"]["pages"]
+        print(f"Content API: {first['meta']['pagination']['total']} posts over {pages} pages")
+
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def fetch_page(page):
+            async with slots:
+                return await http.get_json(endpoint, params=self._api_params(page))
+
+        rest = await asyncio.gather(*(fetch_page(page) for page in range(2, pages + 1)))
+        posts = [post for result in [first] + rest for post in result["posts"]]
+        return [self._api_record(post) for post in posts]
+
+    # RSS
+
+    def _rss_url(self, page):
+        feed = f"{self.base_url}/tag/{self.tag}/rss/" if self.tag else f"{self.base_url}/rss/"
+        return feed if page == 1 else f"{feed}{page}/"
+
+    def _rss_record(self, item):
+        def text(path):
+            el = item.find(path, RSS_NAMESPACES)
+            return (el.text or '') if el is not None else ''
+
+        date = text("pubDate")
+        if date:
+            date = parsedate_to_datetime(date).date().isoformat()
+        media = item.find("media:content", RSS_NAMESPACES)
+
+        return self.post_record(
+            title=text("title"),
+            url=text("link"),
+            excerpt=parse(text("description")).get_text(strip=True),
+            date=date,
+            html=text("content:encoded"),
+            image=media.get("url") if media is not None else None,
+            author=text("dc:creator"),
+            tags=[category.text for category in item.findall("category") if category.text]
+        )
+
+    async def _rss_page(self, http, page):
+        status, body, _ = await http.get(self._rss_url(page))
+        if status == 404:
+            return []
+        if status >= 400:
+            raise RuntimeError(f"RSS page {page} returned HTTP {status}")
+        return ET.fromstring(body.encode('utf-8')).findall("./channel/item")
+
+    async def _fetch_rss(self, http):
+        records = []
+        seen = set()
+        page = 1
+
+        while True:
+            numbers = list(range(page, page + self.concurrency))
+            pages = await asyncio.gather(*(self._rss_page(http, number) for number in numbers))
+
+            for items in pages:
+                for item in items:
+                    record = self._rss_record(item)
+                    if record["url"] not in seen:
+                        seen.add(record["url"])
+                        records.append(record)
+
+            print(f"RSS: {len(records)} posts after page {numbers[-1]}")
+            if any(not items for items in pages):
+                break
+            page += self.concurrency
+
+        return records
+
+    async def fetch_posts(self):
+        async with HttpFetcher(max_connections=self.concurrency, rate_limiter=shared_limiter) as http:
+            if self.content_api_key:
+                records = await self._fetch_api(http)
+            else:
+                records = await self._fetch_rss(http)
+
+        return sorted(records, key=lambda record: record["date"] or '', reverse=True)
+
+    def run(self):
+        return run_sync(self.fetch_posts())
+
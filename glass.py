@@ -1,76 +1,115 @@
 import json
-import time
+import os
+from urllib.parse import urljoin
+from page_parser import parse
 from playwright.sync_api import sync_playwright
+from browser_service import open_browser
+from article_pool import ArticlePool, ArticleJob
+from resource_policy import ResourcePolicy
+from ghost import GhostFeed
+from readiness import Readiness
+from scroll_harvester import ScrollHarvester
 
 class GlassnodeScraper:
-    def __init__(self):
+    def __init__(self, concurrency=4, use_feed=True):
         self.base_url = "https://insights.glassnode.com"
         self.archive_url = f"{self.base_url}/tag/newsletter"
+        self.use_feed = use_feed
+        self.content_api_key = os.environ.get("GLASSNODE_GHOST_KEY")
+        self.resource_policy = ResourcePolicy()
+        self.pool = ArticlePool(browser_type="firefox", concurrency=concurrency, per_domain=concurrency, http_ok=True,
+                                resource_policy=self.resource_policy)
+
+    def parse_article(self, html, url):
+        """Extract article content from server-rendered HTML (HTTP fetch path)"""
+        root = parse(html)
+        article = root.select_one('article.article')
+        if not article:
+            return None
+        
+        images = [{
+            'src': urljoin(url, img.get('src', '')),
+            'alt': img.get('alt', ''),
+            'width': img.get('width', ''),
+            'height': img.get('height', '')
+        } for img in article.select('img')]
+        
+        return {
+            'content': article.get_text(separator='\n', strip=True),
+            'images': images,
+            'tags': [tag.get_text(strip=True) for tag in root.select('.article-tag')]
+        }
+
+    def save_newsletters(self, newsletters):
+        with open("glassnode_newsletters.json", "w", encoding="utf-8") as f:
+            json.dump(newsletters, f, indent=2, ensure_ascii=False)
+        
+        print(f"\nSuccessfully scraped {len(newsletters)} newsletters!")
+
+    def scrape_feed(self):
+        posts = GhostFeed(self.base_url, tag="newsletter", content_api_key=self.content_api_key).run()
+        print(f"\nFound {len(posts)} newsletters in the feed")
+        
+        newsletters = [{
+            "newsletter_id": idx,
+            "source": "Glassnode Insights",
+            "title": post['title'],
+            "publication_date": post['date'],
+            "read_time": post['read_time'],
+            "excerpt": post['excerpt'],
+            "content": post['content'],
+            "url": post['url'],
+            "featured_image": post['image'],
+            "content_images": post['content_images'],
+            "categories": post['tags'] if post['tags'] else ["crypto", "bitcoin", "market-analysis"]
+        } for idx, post in enumerate(posts, 1)]
+        
+        self.save_newsletters(newsletters)
+        return newsletters
 
     def scrape_newsletters(self):
-        with sync_playwright() as p:
-            browser = p.firefox.launch(headless=False)
-            page = browser.new_page()
+        if self.use_feed:
+            return self.scrape_feed()
+        
+        with sync_playwright() as p, open_browser(p, "firefox") as context:
+            page = context.new_page()
+            self.resource_policy.install(page)
             
             try:
                 print(f"Accessing: {self.archive_url}")
                 page.goto(self.archive_url)
-                time.sleep(5)
                 
                 print("Loading newsletter content...")
                 
                 # Wait for content to load
-                page.wait_for_selector(".post-card", timeout=30000)
+                Readiness(selector=".post-card").wait(page)
                 
-                # Scroll to load all content
+                # Scroll to load all content, collecting cards as they render
                 print("Loading all articles...")
-                for _ in range(10):  # More scrolls since there are many articles
-                    page.keyboard.press('End')
-                    time.sleep(3)
-                    print("Scrolling...")
-
-                # Extract articles
-                articles = page.evaluate("""
-                    () => {
-                        const articles = [];
-                        document.querySelectorAll('article.post-card').forEach(post => {
-                            const titleElem = post.querySelector('.post-card-title');
-                            const linkElem = post.querySelector('.post-card-image-link, .post-card-content-link');
-                            const excerptElem = post.querySelector('.post-card-excerpt');
-                            const dateElem = post.querySelector('.post-card-meta-date');
-                            const readTimeElem = post.querySelector('.post-card-meta-length');
-                            const imageElem = post.querySelector('.post-card-image');
-                            
-                            if (titleElem && linkElem) {
-                                articles.push({
-                                    title: titleElem.innerText.trim(),
-                                    url: new URL(linkElem.href, 'https://insights.glassnode.com').href,
-                                    excerpt: excerptElem ? excerptElem.innerText.trim() : '',
-                                    date: dateElem ? dateElem.getAttribute('datetime') : '',
-                                    read_time: readTimeElem ? readTimeElem.innerText.trim() : '',
-                                    image: imageElem ? imageElem.src : null
-                                });
-                            }
-                        });
-                        return articles;
+                articles = ScrollHarvester('article.post-card', rate_limiter=self.pool.rate_limiter, extract="""
+                    post => {
+                        const titleElem = post.querySelector('.post-card-title');
+                        const linkElem = post.querySelector('.post-card-image-link, .post-card-content-link');
+                        const excerptElem = post.querySelector('.post-card-excerpt');
+                        const dateElem = post.querySelector('.post-card-meta-date');
+                        const readTimeElem = post.querySelector('.post-card-meta-length');
+                        const imageElem = post.querySelector('.post-card-image');
+                        
+                        if (!titleElem || !linkElem) return null;
+                        return {
+                            title: titleElem.innerText.trim(),
+                            url: new URL(linkElem.href, 'https://insights.glassnode.com').href,
+                            excerpt: excerptElem ? excerptElem.innerText.trim() : '',
+                            date: dateElem ? dateElem.getAttribute('datetime') : '',
+                            read_time: readTimeElem ? readTimeElem.innerText.trim() : '',
+                            image: imageElem ? imageElem.src : null
+                        };
                     }
-                """)
+                """).harvest(page)
                 
                 print(f"\nFound {len(articles)} newsletters")
                 
-                newsletters = []
-                for idx, article in enumerate(articles, 1):
-                    try:
-                        print(f"\nScraping newsletter {idx}/{len(articles)}")
-                        print(f"URL: {article['url']}")
-                        
-                        # Visit the article page
-                        page.goto(article['url'])
-                        page.wait_for_selector('article.article', timeout=30000)
-                        time.sleep(3)
-                        
-                        # Extract article content
-                        content_data = page.evaluate("""
+                jobs = [ArticleJob(article['url'], wait_for='article.article', parse=self.parse_article, script="""
                             () => {
                                 const getText = selector => {
                                     const el = document.querySelector(selector);
@@ -81,8 +120,8 @@ class GlassnodeScraper:
                                 const images = Array.from(document.querySelectorAll('article.article img')).map(img => ({
                                     src: img.src,
                                     alt: img.alt || '',
-                                    width: img.width || '',
-                                    height: img.height || ''
+                                    width: img.getAttribute('width') || img.naturalWidth || '',
+                                    height: img.getAttribute('height') || img.naturalHeight || ''
                                 }));
                                 
                                 // Get content
@@ -98,37 +137,38 @@ class GlassnodeScraper:
                                     tags
                                 };
                             }
-                        """)
-                        
-                        newsletter_data = {
-                            "newsletter_id": idx,
-                            "source": "Glassnode Insights",
-                            "title": article['title'],
-                            "publication_date": article['date'],
-                            "read_time": article['read_time'],
-                            "excerpt": article['excerpt'],
-                            "content": content_data['content'],
-                            "url": article['url'],
-                            "featured_image": article['image'],
-                            "content_images": content_data['images'],
-                            "categories": content_data['tags'] if content_data['tags'] else ["crypto", "bitcoin", "market-analysis"]
-                        }
-                        
-                        newsletters.append(newsletter_data)
-                        print(f"Successfully scraped: {article['title']}")
-                        print(f"Read time: {article['read_time']}")
-                        print(f"Found {len(content_data['images'])} content images")
-                        time.sleep(2)
-                        
-                    except Exception as e:
-                        print(f"Error scraping article: {str(e)}")
+                        """) for article in articles]
+                
+                print(f"Scraping {len(jobs)} newsletters with {self.pool.concurrency} tabs...")
+                results = self.pool.run(jobs)
+                
+                newsletters = []
+                for idx, (article, content_data) in enumerate(zip(articles, results), 1):
+                    if not content_data:
+                        print(f"Skipping newsletter {idx}/{len(articles)}: {article['url']}")
                         continue
+                    
+                    newsletter_data = {
+                        "newsletter_id": idx,
+                        "source": "Glassnode Insights",
+                        "title": article['title'],
+                        "publication_date": article['date'],
+                        "read_time": article['read_time'],
+                        "excerpt": article['excerpt'],
+                        "content": content_data['content'],
+                        "url": article['url'],
+                        "featured_image": article['image'],
+                        "content_images": content_data['images'],
+                        "categories": content_data['tags'] if content_data['tags'] else ["crypto", "bitcoin", "market-analysis"]
+                    }
+                    
+                    newsletters.append(newsletter_data)
+                    print(f"Successfully scraped: {article['title']}")
+                    print(f"Read time: {article['read_time']}")
+                    print(f"Found {len(content_data['images'])} content images")
                 
                 # Save results
-                with open("glassnode_newsletters.json", "w", encoding="utf-8") as f:
-                    json.dump(newsletters, f, indent=2, ensure_ascii=False)
-                
-                print(f"\nSuccessfully scraped {len(newsletters)} newsletters!")
+                self.save_newsletters(newsletters)
                 
             except Exception as e:
                 print(f"Error during scraping: {str(e)}")
@@ -138,7 +178,7 @@ class GlassnodeScraper:
                 print("Saved error.png and error.html for debugging")
                 
             finally:
-                browser.close()
+                page.close()
 
 def main():
     scraper = GlassnodeScraper()
@@ -0,0 +1,143 @@
+import re
+import time
+import httpx
+from rate_limiter import domain_of
+from page_archive import shared_archive
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
+)
+
+# Markers of Cloudflare / bot-protection interstitials
+CHALLENGE_MARKERS = [
+    "just a moment...",
+    "cf-browser-verification",
+    "challenge-platform",
+    "cf_chl_opt",
+    "enable javascript and cookies to continue",
+    "attention required! | cloudflare",
+]
+
+# Empty mount points left by client-rendered apps
+SHELL_MARKERS = [
+    re.compile(r'<div id="(root|app|__next)">\s*</div>', re.I),
+    re.compile(r"<noscript>[^<]*(enable|requires?) javascript", re.I),
+]
+
+TAG_RE = re.compile(r"<script.*?</script>|<style.*?</style>|<[^>]+>", re.S | re.I)
+
+
+def looks_like_challenge(status, html):
+    """True when the response is a bot-protection page rather than content"""
+    if status in (403, 429, 503):
+        return True
+    head = html[:20000].lower()
+    return any(marker in head for marker in CHALLENGE_MARKERS)
+
+
+def looks_like_shell(html, min_text=500):
+    """True when the HTML is a JS app shell with too little server-rendered text"""
+    if any(marker.search(html) for marker in SHELL_MARKERS):
+        return True
+    text = TAG_RE.sub(" ", html)
+    return len(" ".join(text.split())) < min_text
+
+
+class HttpFetcher:
+    """Pooled async HTTP client (keep-alive, HTTP/2 when available, gzip/brotli)"""
+
+    def __init__(self, max_connections=20, timeout=30, user_agent=DEFAULT_USER_AGENT,
+                 headers=None, cookies=None, rate_limiter=None, archive=None):
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.headers = {
+            "User-Agent": user_agent,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.9",
+        }
+        self.headers.update(headers or {})
+        self.cookies = cookies
+        # Optional RateLimiter consulted before and informed after every request
+        self.rate_limiter = rate_limiter
+        # Every successful response is archived; an offline archive answers instead of the network
+        self.archive = archive or shared_archive
+        self.client = None
+
+    async def __aenter__(self):
+        # httpx negotiates gzip/deflate always and brotli when the brotli package is installed
+        self.client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            headers=self.headers,
+            cookies=self.cookies,
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+        self.client = None
+
+    def _archived(self, key):
+        entry = self.archive.entry(key)
+        request = httpx.Request("GET", key)
+        if not entry:
+            return httpx.Response(404, request=request)
+        return httpx.Response(entry["status"], content=self.archive.get(key).encode("utf-8"),
+                              headers={"Content-Type": f"{entry['content_type']}; charset=utf-8"},
+                              request=request)
+
+    async def _request(self, url, **kwargs):
+        params = kwargs.get("params")
+        key = str(httpx.URL(url, params=params)) if params else url
+        if self.archive.offline:
+            return self._archived(key)
+
+        domain = domain_of(url)
+        if self.rate_limiter:
+            await self.rate_limiter.acquire(domain)
+        started = time.monotonic()
+        try:
+            response = await self.client.get(url, **kwargs)
+        except httpx.HTTPError:
+            if self.rate_limiter:
+                self.rate_limiter.report(domain, error=True)
+            raise
+        challenge = looks_like_challenge(response.status_code, response.text)
+        if self.rate_limiter:
+            self.rate_limiter.report(domain, status=response.status_code,
+                                     latency=time.monotonic() - started, challenge=challenge)
+        if response.status_code < 400 and not challenge:
+            self.archive.put(key, response.text, status=response.status_code,
+                             content_type=response.headers.get("content-type"), final_url=str(response.url))
+        return response
+
+    async def get(self, url):
+        """Return (status, html, final_url) for a page"""
+        response = await self._request(url)
+        return response.status_code, response.text, str(response.url)
+
+    async def get_json(self, url, params=None):
+        response = await self._request(url, params=params, headers={"Accept": "application/json"})
+        response.raise_for_status()
+        return response.json()
+
+    async def fetch_html(self, url, min_text=500):
+        """Return page HTML, or None when it needs a real browser to render"""
+        status, html, _ = await self.get(url)
+        if looks_like_challenge(status, html):
+            return None
+        if status >= 400 or looks_like_shell(html, min_text):
+            return None
+        return html
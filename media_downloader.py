@@ -0,0 +1,122 @@
+import asyncio
+import os
+import time
+from telethon.errors import FloodWaitError
+
+
+class MediaDownloader:
+    """Downloads message media on a bounded pool of workers while the history crawl continues
+
+    Files already on disk with the expected size are skipped, and each message
+    record gets its final media_bytes on completion. A FloodWait pauses every
+    worker until it expires and does not count as a failed attempt.
+    """
+
+    def __init__(self, client, concurrency=4, root='downloads', max_retries=5, queue_size=500,
+                 on_complete=None):
+        self.client = client
+        # Called with the record once its media is downloaded (or has failed for good)
+        self.on_complete = on_complete
+        self.concurrency = concurrency
+        self.root = root
+        self.max_retries = max_retries
+        # Bounded so a fast crawl cannot pile up unbounded pending jobs
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.workers = []
+        # monotonic time until which the server has asked us to stop downloading
+        self.blocked_until = 0
+        self.downloaded = 0
+        self.skipped = 0
+        self.failed = 0
+        self.bytes = 0
+
+    async def __aenter__(self):
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        return self
+
+    async def __aexit__(self, *exc):
+        # Finish what is queued, then stop the workers
+        await self.queue.join()
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        print(f"Media: {self.downloaded} downloaded ({self.bytes / 1024 / 1024:.1f} MB), "
+              f"{self.skipped} already on disk, {self.failed} failed")
+
+    def media_path(self, message):
+        """Return (media_type, path) for a message's media, or None when it has none to download"""
+        if hasattr(message.media, 'photo'):
+            return 'photo', os.path.join(self.root, 'photos', f'{message.id}.jpg')
+        if hasattr(message.media, 'document'):
+            name = message.file.name or f'document{message.file.ext or ""}'
+            return 'document', os.path.join(self.root, 'documents', f'{message.id}_{name}')
+        return None
+
+    async def submit(self, message, record, on_complete=None):
+        """Queue the message's media for download, filling media fields on the record
+
+        on_complete overrides the downloader's callback for this record, e.g.
+        to route it to the store of the channel it came from. Returns True when
+        a download was queued, i.e. when on_complete will be called.
+        """
+        media = self.media_path(message)
+        if not media:
+            return False
+        record['media_type'], path = media
+        record['media_path'] = path
+
+        expected = message.file.size if message.file else None
+        if os.path.exists(path) and os.path.getsize(path) > 0 and \
+                (expected is None or os.path.getsize(path) == expected):
+            record['media_bytes'] = os.path.getsize(path)
+            self.skipped += 1
+            return False
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        await self.queue.put((message, path, record, on_complete or self.on_complete))
+        return True
+
+    async def _wait_flood(self):
+        while True:
+            delay = self.blocked_until - time.monotonic()
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    async def _download(self, message, path, record, on_complete):
+        attempt = 0
+        while attempt < self.max_retries:
+            await self._wait_flood()
+            try:
+                result = await message.download_media(path)
+                if result is None:
+                    # Nothing downloadable (webpage preview, poll, expired media)
+                    record['media_path'] = None
+                    break
+                record['media_path'] = result
+                record['media_bytes'] = os.path.getsize(result)
+                self.downloaded += 1
+                self.bytes += record['media_bytes']
+                break
+            except FloodWaitError as e:
+                print(f"FloodWait on media for message {message.id}: pausing downloads for {e.seconds}s")
+                self.blocked_until = max(self.blocked_until, time.monotonic() + e.seconds + 1)
+            except Exception as e:
+                delay = 2 ** attempt
+                attempt += 1
+                print(f"Media download failed for message {message.id} ({str(e)}), retrying in {delay}s")
+                await asyncio.sleep(delay)
+        else:
+            record['media_error'] = f"gave up after {self.max_retries} attempts"
+            self.failed += 1
+
+        if on_complete:
+            on_complete(record)
+
+    async def _worker(self):
+        while True:
+            message, path, record, on_complete = await self.queue.get()
+            try:
+                await self._download(message, path, record, on_complete)
+            finally:
+                self.queue.task_done()
@@ -1,18 +1,18 @@
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
+from page_parser import parse
 import datetime
 from typing import Dict, List
 import re
 from textblob import TextBlob
 import spacy
 import json
-import time
 from webdriver_manager.chrome import ChromeDriverManager
+from readiness import Readiness
+from browser_service import service_address
 
 class NewsletterScraper:
     def __init__(self):
@@ -28,9 +28,21 @@ class NewsletterScraper:
         chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
         chrome_options.add_experimental_option('useAutomationExtension', False)
         
+        # Attach to the warm browser service when it is running; ChromeDriver accepts no
+        # launch options alongside debuggerAddress, and the browser is not ours to close
+        address = service_address()
+        if address:
+            print(f"Attaching to warm browser service at {address}")
+            chrome_options = Options()
+            chrome_options.add_experimental_option("debuggerAddress", address)
+        self.attached = bool(address)
+        
         # Initialize the Chrome WebDriver with automatic ChromeDriver management
         service = Service(ChromeDriverManager().install())
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        if self.attached:
+            # Work in a tab of our own and leave the service's pages alone
+            self.driver.switch_to.new_window('tab')
         
         # Load spaCy model for entity extraction
         self.nlp = spacy.load("en_core_web_sm")
@@ -60,23 +72,19 @@ class NewsletterScraper:
             EC.presence_of_element_located((by, value))
         )
 
-    def scroll_to_bottom(self):
-        """Scroll to the bottom of the page to load all articles"""
-        SCROLL_PAUSE_TIME = 2
-        last_height = self.driver.execute_script("return document.body.scrollHeight")
+    def scroll_to_bottom(self, item_selector, settle_ms=4000):
+        """Scroll until another scroll renders no more items, waiting for each batch to settle"""
+        count_script = "return document.querySelectorAll(arguments[0]).length;"
+        count = self.driver.execute_script(count_script, item_selector)
         
         while True:
-            # Scroll down
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(SCROLL_PAUSE_TIME)
-            
-            # Calculate new scroll height
-            new_height = self.driver.execute_script("return document.body.scrollHeight")
-            
-            if new_height == last_height:
+            try:
+                Readiness(selector=item_selector, min_count=count + 1, timeout=settle_ms).wait_selenium(self.driver)
+            except TimeoutError:
                 break
-            last_height = new_height
-            print("Scrolling to load more articles...")
+            count = self.driver.execute_script(count_script, item_selector)
+            print(f"Scrolling to load more articles... {count} so far")
 
     def scrape_newsletters(self) -> List[Dict]:
         """Scrape newsletter data and return in structured format"""
@@ -85,30 +93,29 @@ class NewsletterScraper:
         try:
             print("Fetching data from:", self.url)
             self.driver.get(self.url)
-            time.sleep(5)  # Initial wait for page load
             
             # Wait for the first article to load
-            self.wait_and_find_element(By.CSS_SELECTOR, "article.post-preview")
+            Readiness(selector="article.post-preview").wait_selenium(self.driver)
             
             # Scroll to load all articles
             print("Loading all articles...")
-            self.scroll_to_bottom()
+            self.scroll_to_bottom('article.post-preview')
             
             # Get page source after all content is loaded
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            articles = soup.find_all('article', class_='post-preview')
+            root = parse(self.driver.page_source)
+            articles = root.select('article.post-preview')
             
             print(f"Found {len(articles)} articles")
             
             for idx, article in enumerate(articles, 1):
                 try:
                     # Extract title and URL
-                    title_elem = article.find('h3', class_='post-preview-title')
+                    title_elem = article.select_one('h3.post-preview-title')
                     if not title_elem:
                         continue
                     
                     title = title_elem.text.strip()
-                    url_elem = article.find('a', href=True)
+                    url_elem = article.select_one('a[href]')
                     url = url_elem['href'] if url_elem else None
                     
                     if not url:
@@ -122,23 +129,26 @@ class NewsletterScraper:
                     
                     # Visit the article page
                     self.driver.get(url)
-                    time.sleep(3)  # Wait for content to load
+                    try:
+                        Readiness(selector="div.post-content", timeout=10000).wait_selenium(self.driver)
+                    except TimeoutError:
+                        print("Content container did not appear")
                     
                     # Get the article content
-                    article_soup = BeautifulSoup(self.driver.page_source, 'html.parser')
+                    article_root = parse(self.driver.page_source)
                     
                     # Extract date
-                    date_elem = article_soup.find('time')
+                    date_elem = article_root.select_one('time')
                     date_str = date_elem.get('datetime') if date_elem else ""
                     print(f"Date: {date_str}")  # Debug print
                     
                     # Extract content
-                    content_elem = article_soup.find('div', class_='post-content')
+                    content_elem = article_root.select_one('div.post-content')
                     content = content_elem.text.strip() if content_elem else ""
                     print(f"Content length: {len(content)}")  # Debug print
                     
                     # Extract author
-                    author_elem = article_soup.find('a', class_='user-name')
+                    author_elem = article_root.select_one('a.user-name')
                     author = author_elem.text.strip() if author_elem else "Decentralised Team"
                     print(f"Author: {author}")  # Debug print
                     
@@ -170,6 +180,8 @@ class NewsletterScraper:
             print(f"Error scraping newsletters: {str(e)}")
             
         finally:
+            if self.attached:
+                self.driver.close()
             self.driver.quit()
             
         return newsletters
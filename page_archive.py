@@ -0,0 +1,228 @@
+import hashlib
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import urldefrag
+import zstandard
+
+ARCHIVE_DIR = "page_archive"
+# Set (to anything but 0) to replay from the archive; inherited by worker processes
+OFFLINE_ENV = "PAGE_ARCHIVE_OFFLINE"
+
+
+def archive_key(url):
+    # Fragments never reach the server, so they never distinguish two fetches
+    return urldefrag(url)[0]
+
+
+class PageArchive:
+    """Every fetched page stored once as a zstd blob named by its SHA-256, plus an append-only URL index
+
+    index.ndjson gets one record per fetch (url, hash, fetch time, status,
+    content type); the latest record of a URL wins. With offline=True the
+    fetchers serve pages from here and never touch the network, which is how
+    `reextract` replays a scraper's extraction over what was already crawled.
+    """
+
+    def __init__(self, root=ARCHIVE_DIR, level=10, offline=None):
+        self.root = root
+        self.level = level
+        self.index_path = os.path.join(root, "index.ndjson")
+        if offline is None:
+            offline = os.environ.get(OFFLINE_ENV, "0") not in ("", "0")
+        self.offline = offline
+        # url -> latest index record, loaded on first use
+        self.entries = None
+        self.lock = threading.Lock()
+
+    def _load(self):
+        if self.entries is not None:
+            return
+        self.entries = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A crash can leave a torn final line
+                        continue
+                    self.entries[record["url"]] = record
+
+    def blob_path(self, digest):
+        return os.path.join(self.root, "blobs", digest[:2], f"{digest}.zst")
+
+    def put(self, url, html, status=200, content_type="text/html", final_url=None):
+        """Store a fetched page and return its hash; identical content is only written once"""
+        if self.offline or html is None:
+            return None
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(zstandard.ZstdCompressor(level=self.level).compress(data))
+            os.replace(tmp_path, path)
+
+        url = archive_key(url)
+        record = {
+            "url": url,
+            "hash": digest,
+            "fetched": time.time(),
+            "status": status,
+            "content_type": (content_type or "text/html").split(";")[0].strip(),
+            "bytes": len(data),
+        }
+        if final_url and archive_key(final_url) != url:
+            record["final_url"] = final_url
+        with self.lock:
+            self._load()
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+            self.entries[url] = record
+        return digest
+
+    def entry(self, url):
+        """The latest index record for a URL, or None"""
+        with self.lock:
+            self._load()
+            return self.entries.get(archive_key(url))
+
+    def get(self, url):
+        """The latest archived body of a URL, or None"""
+        entry = self.entry(url)
+        if not entry:
+            return None
+        with open(self.blob_path(entry["hash"]), "rb") as f:
+            return zstandard.ZstdDecompressor().decompress(f.read()).decode("utf-8")
+
+    def urls(self, prefix=""):
+        with self.lock:
+            self._load()
+            return [url for url in self.entries if url.startswith(prefix)]
+
+    def stats(self):
+        with self.lock:
+            self._load()
+            entries = list(self.entries.values())
+        blobs = {entry["hash"] for entry in entries}
+        stored = sum(os.path.getsize(self.blob_path(digest)) for digest in blobs
+                     if os.path.exists(self.blob_path(digest)))
+        return {
+            "urls": len(entries),
+            "blobs": len(blobs),
+            "raw_bytes": sum(entry["bytes"] for entry in entries),
+            "stored_bytes": stored,
+        }
+
+    # Playwright: archive what a browser context loads. Listing pages rendered client-side
+    # need their scripts and XHR/fetch responses too to replay; only GETs are keyed by URL alone.
+
+    RECORDED_TYPES = ("document", "script", "xhr", "fetch")
+
+    def _recordable(self, response):
+        request = response.request
+        return (not self.offline and request.method == "GET" and request.resource_type in self.RECORDED_TYPES
+                and 200 <= response.status < 300)
+
+    def _record_body(self, response, body):
+        # Imported here: http_fetch archives into this module
+        from http_fetch import looks_like_challenge
+        if response.request.resource_type == "document" and looks_like_challenge(response.status, body):
+            return
+        self.put(response.url, body, status=response.status, content_type=response.headers.get("content-type"))
+
+    def _on_response_sync(self, response):
+        if self._recordable(response):
+            try:
+                self._record_body(response, response.text())
+            except Exception:
+                # Binary bodies, or bodies already gone with their page
+                pass
+
+    async def _on_response_async(self, response):
+        if self._recordable(response):
+            try:
+                self._record_body(response, await response.text())
+            except Exception:
+                pass
+
+    def record(self, context):
+        """Archive the responses of a sync Playwright context; returns the handler for remove_listener"""
+        context.on("response", self._on_response_sync)
+        return self._on_response_sync
+
+    def record_async(self, context):
+        """Archive the responses of an async Playwright context"""
+        context.on("response", self._on_response_async)
+        return self._on_response_async
+
+    # Playwright: serve archived URLs and abort everything else, for offline runs
+
+    def _fulfill_args(self, url):
+        entry = self.entry(url)
+        if not entry:
+            return None
+        return {"status": entry["status"], "content_type": f"{entry['content_type']}; charset=utf-8",
+                "body": self.get(url)}
+
+    async def _route_async(self, route):
+        args = self._fulfill_args(route.request.url)
+        if args:
+            await route.fulfill(**args)
+        else:
+            await route.abort()
+
+    def _route_sync(self, route):
+        args = self._fulfill_args(route.request.url)
+        if args:
+            route.fulfill(**args)
+        else:
+            route.abort()
+
+    async def install_async(self, target):
+        """Install on an async Playwright page or browser context"""
+        await target.route("**/*", self._route_async)
+
+    def install(self, target):
+        """Install on a sync Playwright page or browser context"""
+        target.route("**/*", self._route_sync)
+
+
+# One archive for every fetcher in the process
+shared_archive = PageArchive()
+
+
+def main():
+    # python page_archive.py stats
+    # python page_archive.py show <url>
+    # python page_archive.py reextract <scraper module> [scraper args ...]
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    if command == "show":
+        html = shared_archive.get(sys.argv[2])
+        print(html if html is not None else f"{sys.argv[2]} is not archived")
+    elif command == "reextract":
+        # Re-run the scraper end to end with every fetch answered from the archive. Not
+        # replayable: newsletter_scraper.py (Selenium, never archived), the Beacons scroll
+        # fallback (drives a live DrissionPage tab) and the Telegram scrapers (no pages).
+        # Run as a script this module is __main__, so the fetchers' page_archive.shared_archive
+        # is a different object; the environment reaches it and any worker processes as well.
+        os.environ[OFFLINE_ENV] = "1"
+        import page_archive
+        page_archive.shared_archive.offline = True
+        name = sys.argv[2].removesuffix(".py")
+        sys.argv = [f"{name}.py"] + sys.argv[3:]
+        importlib.import_module(name).main()
+    else:
+        stats = shared_archive.stats()
+        print(f"{stats['urls']} URLs in {stats['blobs']} blobs, "
+              f"{stats['raw_bytes'] / 1024 / 1024:.1f} MB stored as {stats['stored_bytes'] / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
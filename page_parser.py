@@ -0,0 +1,222 @@
+import re
+import sys
+import time
+from bs4 import BeautifulSoup, Comment
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+try:
+    import lxml.html
+    import cssselect  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Fastest first; BeautifulSoup's pure-Python parser is always there as the fallback
+BACKENDS = [name for name, available in (('selectolax', SELECTOLAX_AVAILABLE),
+                                         ('lxml', LXML_AVAILABLE),
+                                         ('bs4', True)) if available]
+DEFAULT_BACKEND = BACKENDS[0]
+
+# Never part of the text the scrapers extract, nor children of anything; every backend drops
+# them (and comments) while keeping the text around them as separate strings
+NON_TEXT_TAGS = ('script', 'style', 'template')
+# Joins text nodes internally so they can be stripped one by one
+TEXT_BREAK = '\x00'
+WHITESPACE = re.compile(r'\s+')
+
+
+def collapse_whitespace(text):
+    """Runs of whitespace become one newline if they hold one, else one space. Parsers split
+    whitespace-only text differently, so this is what makes unstripped text agree across backends."""
+    return WHITESPACE.sub(lambda match: '\n' if '\n' in match.group() else ' ', text)
+
+
+def join_text(strings, separator, strip):
+    """BeautifulSoup's get_text over the element's text strings: with strip, each string is
+    stripped and empty ones dropped; without it, whitespace is collapsed (see collapse_whitespace)"""
+    if strip:
+        strings = [s.strip() for s in strings]
+        return separator.join(s for s in strings if s)
+    return collapse_whitespace(separator.join(strings))
+
+
+class Node:
+    """An element with the small BeautifulSoup-like surface the scrapers use: CSS selection,
+    text and attributes, whatever parser produced it"""
+
+    def select(self, css):
+        raise NotImplementedError
+
+    def select_one(self, css):
+        found = self.select(css)
+        return found[0] if found else None
+
+    def strings(self):
+        """The element's text nodes in document order"""
+        raise NotImplementedError
+
+    def get_text(self, separator='', strip=False):
+        return join_text(self.strings(), separator, strip)
+
+    @property
+    def text(self):
+        return self.get_text()
+
+    def get(self, name, default=None):
+        return self.attrs.get(name, default)
+
+    def __getitem__(self, name):
+        return self.attrs[name]
+
+
+class SelectolaxNode(Node):
+    def __init__(self, node):
+        self.node = node
+
+    @property
+    def tag(self):
+        return self.node.tag
+
+    @property
+    def attrs(self):
+        return {name: value or '' for name, value in self.node.attributes.items()}
+
+    @property
+    def children(self):
+        # iter() also yields comment nodes, tagged '-comment'
+        return [SelectolaxNode(child) for child in self.node.iter() if not child.tag.startswith('-')]
+
+    def select(self, css):
+        return [SelectolaxNode(node) for node in self.node.css(css)]
+
+    def select_one(self, css):
+        node = self.node.css_first(css)
+        return SelectolaxNode(node) if node is not None else None
+
+    def strings(self):
+        return self.node.text(deep=True, separator=TEXT_BREAK).split(TEXT_BREAK)
+
+
+class LxmlNode(Node):
+    def __init__(self, element):
+        self.element = element
+
+    @property
+    def tag(self):
+        return self.element.tag
+
+    @property
+    def attrs(self):
+        return dict(self.element.attrib)
+
+    @property
+    def children(self):
+        # Comments (a callable tag) and non-text elements are left in the tree, see strings()
+        return [LxmlNode(child) for child in self.element
+                if isinstance(child.tag, str) and child.tag not in NON_TEXT_TAGS]
+
+    def select(self, css):
+        return [LxmlNode(element) for element in self.element.cssselect(css)]
+
+    def strings(self):
+        # lxml keeps the text after an element as its tail; removing comments or scripts would
+        # merge that into the preceding text, so they are skipped here instead
+        strings = []
+
+        def walk(element):
+            if element.text:
+                strings.append(element.text)
+            for child in element:
+                if isinstance(child.tag, str) and child.tag not in NON_TEXT_TAGS:
+                    walk(child)
+                if child.tail:
+                    strings.append(child.tail)
+
+        walk(self.element)
+        return strings
+
+
+class SoupNode(Node):
+    def __init__(self, tag):
+        self.soup = tag
+
+    @property
+    def tag(self):
+        return self.soup.name
+
+    @property
+    def attrs(self):
+        # Multi-valued attributes (class) as the raw string, like the other backends
+        return {name: ' '.join(value) if isinstance(value, list) else value
+                for name, value in self.soup.attrs.items()}
+
+    @property
+    def children(self):
+        return [SoupNode(child) for child in self.soup.children if child.name]
+
+    def select(self, css):
+        return [SoupNode(tag) for tag in self.soup.select(css)]
+
+    def select_one(self, css):
+        tag = self.soup.select_one(css)
+        return SoupNode(tag) if tag is not None else None
+
+    def strings(self):
+        return list(self.soup.strings)
+
+
+def parse(html, backend=None):
+    """Parse a page with the fastest available backend (or the one named) and return its root Node"""
+    backend = backend or DEFAULT_BACKEND
+    if backend == 'selectolax':
+        tree = LexborHTMLParser(html)
+        tree.strip_tags(list(NON_TEXT_TAGS))
+        return SelectolaxNode(tree.root)
+    if backend == 'lxml':
+        # lxml refuses an empty document where the other parsers return an empty tree
+        return LxmlNode(lxml.html.document_fromstring(html if html.strip() else '<html></html>'))
+    if backend == 'bs4':
+        soup = BeautifulSoup(html, 'html.parser')
+        for tag in soup(list(NON_TEXT_TAGS)):
+            tag.decompose()
+        for comment in soup.find_all(string=lambda string: isinstance(string, Comment)):
+            comment.extract()
+        return SoupNode(soup)
+    raise ValueError(f"Unknown parser backend: {backend}")
+
+
+def benchmark(html, backends=None, rounds=5):
+    """Time parse plus a typical extraction per backend; returns {backend: seconds per round}"""
+    results = {}
+    for backend in backends or BACKENDS:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            root = parse(html, backend)
+            links = [a.get('href') for a in root.select('a[href]')]
+            body = root.select_one('body')
+            text = body.get_text(separator='\n', strip=True) if body else ''
+        results[backend] = (time.perf_counter() - started) / rounds
+        print(f"{backend:>10}: {results[backend] * 1000:8.1f} ms/page "
+              f"({len(links)} links, {len(text)} chars of text)")
+    return results
+
+
+def main():
+    # python page_parser.py [file.html]
+    path = sys.argv[1] if len(sys.argv) > 1 else 'page_content.html'
+    with open(path, encoding='utf-8') as f:
+        html = f.read()
+    print(f"Parsing {path} ({len(html) / 1024 / 1024:.1f} MB)")
+    results = benchmark(html)
+    slowest = results.get('bs4', max(results.values()))
+    for backend, seconds in results.items():
+        print(f"{backend:>10}: {slowest / seconds:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
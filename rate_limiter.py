@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+from urllib.parse import urlparse
+
+# Responses that mean the site wants us to slow down
+PRESSURE_STATUSES = (403, 429, 503)
+
+
+def domain_of(url):
+    return urlparse(url).netloc.lower()
+
+
+class DomainBucket:
+    """Token bucket state for one domain"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        # Earliest time the next request may start
+        self.next_slot = 0.0
+        self.requests = 0
+        self.slowdowns = 0
+        self.latency = None
+
+
+class RateLimiter:
+    """Per-domain token buckets whose rates adapt to how each site responds
+
+    Rates grow additively while a site answers quickly and cleanly, and are cut
+    multiplicatively on 403/429/503, Cloudflare challenges, errors or slow
+    responses (AIMD). Safe to share between threads and event loops.
+    """
+
+    def __init__(self, rate=0.5, min_rate=0.05, max_rate=8.0, burst=2, increase=0.1,
+                 decrease=0.5, slow_seconds=8.0):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_seconds = slow_seconds
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def _bucket(self, domain):
+        if domain not in self.buckets:
+            self.buckets[domain] = DomainBucket(self.rate)
+        return self.buckets[domain]
+
+    def _reserve(self, domain):
+        """Claim the next slot for the domain and return how long to wait for it"""
+        with self.lock:
+            bucket = self._bucket(domain)
+            now = time.monotonic()
+            interval = 1 / bucket.rate
+            # Idle time banks up to `burst` requests that may start back to back
+            slot = max(bucket.next_slot, now - (self.burst - 1) * interval)
+            bucket.next_slot = slot + interval
+            bucket.requests += 1
+            return max(0.0, slot - now)
+
+    async def acquire(self, domain):
+        """Wait until a request to the domain is allowed"""
+        delay = self._reserve(domain)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def acquire_sync(self, domain):
+        delay = self._reserve(domain)
+        if delay:
+            time.sleep(delay)
+
+    def report(self, domain, status=None, latency=None, challenge=False, error=False):
+        """Feed back how a request went so the domain's rate can adapt"""
+        with self.lock:
+            bucket = self._bucket(domain)
+            if latency is not None:
+                bucket.latency = latency if bucket.latency is None else 0.8 * bucket.latency + 0.2 * latency
+
+            slow = latency is not None and latency > self.slow_seconds
+            if status in PRESSURE_STATUSES or challenge or error or slow:
+                bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+                bucket.slowdowns += 1
+                # Hold off a full interval at the new rate before the next request
+                bucket.next_slot = max(bucket.next_slot, time.monotonic() + 1 / bucket.rate)
+            else:
+                bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+
+    def summary(self):
+        lines = ["Rate limiter:"]
+        for domain, bucket in sorted(self.buckets.items()):
+            latency = f"{bucket.latency:.2f}s" if bucket.latency is not None else "n/a"
+            lines.append(f"  {domain}: {bucket.requests} requests, {bucket.rate:.2f} req/s, "
+                         f"{bucket.slowdowns} slowdowns, latency {latency}")
+        return "\n".join(lines)
+
+
+# One limiter per process so every fetcher shares what it learns about each site
+shared_limiter = RateLimiter()
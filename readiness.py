@@ -0,0 +1,94 @@
+import itertools
+import time
+
+# Resolves once the expected elements are present and the DOM has stopped changing, or
+# quietCap ms after they appeared on a page that never goes quiet (tickers, carousels).
+# Attribute changes are not watched, only structure and text. Each wait passes its own
+# token; the first poll of a wait replaces any earlier wait's observer and timings, so a
+# second wait on the same document (after a click, say) starts from scratch.
+READY_SCRIPT = """
+    (cfg) => {
+        if (document.readyState === 'loading') return false;
+        if (!window.__readiness || window.__readiness.token !== cfg.token) {
+            if (window.__readiness) window.__readiness.observer.disconnect();
+            const state = { token: cfg.token, last: performance.now(), met: null };
+            state.observer = new MutationObserver(() => { state.last = performance.now(); });
+            state.observer.observe(document, { subtree: true, childList: true, characterData: true });
+            window.__readiness = state;
+            return false;
+        }
+        const state = window.__readiness;
+        if (cfg.selector && document.querySelectorAll(cfg.selector).length < cfg.minCount) {
+            state.met = null;
+            return false;
+        }
+        const now = performance.now();
+        state.met = state.met || now;
+        return now - state.last >= cfg.quietMs || now - state.met >= cfg.quietCap;
+    }
+"""
+
+
+# Distinguishes successive waits on one document
+_wait_tokens = itertools.count(1)
+
+
+class Readiness:
+    """Describes when a page is ready to extract: expected selector count, a DOM quiet
+    period (capped so a page that never settles still proceeds), and optionally network
+    idle (capped so chatty analytics cannot stall us)"""
+
+    def __init__(self, selector=None, min_count=1, quiet_ms=500, quiet_cap=3000, network_idle=False,
+                 idle_cap=5000, timeout=30000):
+        self.selector = selector
+        self.min_count = min_count
+        self.quiet_ms = quiet_ms
+        self.quiet_cap = quiet_cap
+        self.network_idle = network_idle
+        self.idle_cap = idle_cap
+        self.timeout = timeout
+
+    def config(self):
+        """Arguments for one wait; every call starts a new wait"""
+        return {'selector': self.selector, 'minCount': self.min_count, 'quietMs': self.quiet_ms,
+                'quietCap': self.quiet_cap, 'token': next(_wait_tokens)}
+
+    def wait(self, page):
+        """Wait on a sync Playwright page"""
+        if self.network_idle:
+            try:
+                page.wait_for_load_state('networkidle', timeout=self.idle_cap)
+            except Exception:
+                pass
+        page.wait_for_function(READY_SCRIPT, arg=self.config(), timeout=self.timeout, polling=100)
+
+    async def wait_async(self, page):
+        """Wait on an async Playwright page"""
+        if self.network_idle:
+            try:
+                await page.wait_for_load_state('networkidle', timeout=self.idle_cap)
+            except Exception:
+                pass
+        await page.wait_for_function(READY_SCRIPT, arg=self.config(), timeout=self.timeout, polling=100)
+
+    def _poll(self, run_js):
+        deadline = time.monotonic() + self.timeout / 1000
+        script = f"return ({READY_SCRIPT})(arguments[0]);"
+        config = self.config()
+        while time.monotonic() < deadline:
+            try:
+                if run_js(script, config):
+                    return
+            except Exception:
+                # The document can be swapped out mid-navigation; poll again
+                pass
+            time.sleep(0.1)
+        raise TimeoutError(f"Page not ready after {self.timeout}ms: {self.selector or 'DOM quiet'}")
+
+    def wait_drission(self, driver):
+        """Wait on a DrissionPage ChromiumPage or tab"""
+        self._poll(driver.run_js)
+
+    def wait_selenium(self, driver):
+        """Wait on a Selenium WebDriver"""
+        self._poll(driver.execute_script)
@@ -0,0 +1,130 @@
+from collections import Counter
+from urllib.parse import urlparse
+
+# Rough transfer sizes used to estimate what a blocked request would have cost
+TYPICAL_BYTES = {
+    'image': 80000,
+    'media': 500000,
+    'font': 40000,
+    'stylesheet': 30000,
+    'script': 60000,
+    'xhr': 5000,
+    'fetch': 5000,
+    'other': 5000,
+}
+
+DEFAULT_BLOCKED_TYPES = ['image', 'media', 'font']
+
+DEFAULT_BLOCKED_DOMAINS = [
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'facebook.net',
+    'connect.facebook.net',
+    'hotjar.com',
+    'segment.io',
+    'segment.com',
+    'intercom.io',
+    'sentry.io',
+    'clarity.ms',
+    'youtube.com',
+    'player.vimeo.com',
+    'twitter.com/i/',
+    'platform.twitter.com',
+]
+
+# CDP has no resource-type filter, so DrissionPage blocking maps types to URL patterns
+TYPE_URL_PATTERNS = {
+    'image': ['*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.avif*', '*.svg*', '*.ico*'],
+    'media': ['*.mp4*', '*.webm*', '*.m3u8*', '*.mp3*'],
+    'font': ['*.woff*', '*.woff2*', '*.ttf*', '*.otf*'],
+    'stylesheet': ['*.css*'],
+}
+
+
+class ResourcePolicy:
+    """Blocks heavy or irrelevant requests by resource type and by domain, and keeps a report
+
+    Only text and img.src attributes are read from article pages, so images,
+    media, fonts, analytics and embeds never need to be downloaded.
+    """
+
+    def __init__(self, block_types=None, block_domains=None, allow_domains=None):
+        self.block_types = set(DEFAULT_BLOCKED_TYPES if block_types is None else block_types)
+        self.block_domains = list(DEFAULT_BLOCKED_DOMAINS if block_domains is None else block_domains)
+        # Domains that must always load, e.g. a Cloudflare challenge host
+        self.allow_domains = list(allow_domains or ['challenges.cloudflare.com'])
+        self.blocked = Counter()
+        self.blocked_bytes = 0
+        self.allowed = 0
+
+    def _matches(self, url, domains):
+        parts = urlparse(url)
+        target = parts.netloc.lower() + parts.path
+        return any(domain in target for domain in domains)
+
+    def should_block(self, url, resource_type):
+        if self._matches(url, self.allow_domains):
+            return False
+        if resource_type in self.block_types:
+            return True
+        return self._matches(url, self.block_domains)
+
+    def _record(self, url, resource_type):
+        if self.should_block(url, resource_type):
+            self.blocked[resource_type] += 1
+            self.blocked_bytes += TYPICAL_BYTES.get(resource_type, TYPICAL_BYTES['other'])
+            return True
+        self.allowed += 1
+        return False
+
+    # Playwright
+
+    async def _route_async(self, route):
+        request = route.request
+        if self._record(request.url, request.resource_type):
+            await route.abort()
+        else:
+            await route.fallback()
+
+    def _route_sync(self, route):
+        request = route.request
+        if self._record(request.url, request.resource_type):
+            route.abort()
+        else:
+            route.fallback()
+
+    async def install_async(self, target):
+        """Install on an async Playwright page or browser context"""
+        await target.route("**/*", self._route_async)
+
+    def install(self, target):
+        """Install on a sync Playwright page or browser context"""
+        target.route("**/*", self._route_sync)
+
+    # DrissionPage
+
+    def blocked_url_patterns(self):
+        patterns = []
+        for resource_type in sorted(self.block_types):
+            patterns.extend(TYPE_URL_PATTERNS.get(resource_type, []))
+        patterns.extend(f"*{domain}*" for domain in self.block_domains)
+        return patterns
+
+    def install_drission(self, driver):
+        """Install on a DrissionPage ChromiumPage or tab via CDP Network.setBlockedURLs
+
+        CDP reports no per-request callback here, so the report only counts
+        requests for Playwright pages.
+        """
+        driver.run_cdp('Network.enable')
+        driver.run_cdp('Network.setBlockedURLs', urls=self.blocked_url_patterns())
+
+    def report(self):
+        total_blocked = sum(self.blocked.values())
+        total = total_blocked + self.allowed
+        lines = [f"Resource policy: blocked {total_blocked} of {total} requests, "
+                 f"~{self.blocked_bytes / 1024 / 1024:.1f} MB saved (estimated)"]
+        for resource_type, count in self.blocked.most_common():
+            lines.append(f"  {resource_type}: {count}")
+        return "\n".join(lines)
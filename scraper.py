@@ -1,42 +1,53 @@
 from playwright.sync_api import sync_playwright
-from bs4 import BeautifulSoup
+from browser_service import open_browser
+from page_parser import parse
+from urllib.parse import urljoin
+from readiness import Readiness
 import csv
 
 BASE_URL = "https://www.decentralised.co/archive"
 CSV_FILE = "newsletters.csv"
 
 def get_newsletter_links():
-    with sync_playwright() as p:
-        browser = p.chromium.launch()
-        page = browser.new_page()
+    with sync_playwright() as p, open_browser(p, "chromium", headless=True) as context:
+        page = context.new_page()
         page.goto(BASE_URL)
-        # Wait for content to load (adjust time if needed)
-        page.wait_for_timeout(3000)
+        # Wait for the archive links to render
+        Readiness(selector='div.flex.flex-col.gap-2 a[href*="/archive/"]').wait(page)
         html = page.content()
-        browser.close()
+        page.close()
 
-    soup = BeautifulSoup(html, 'html.parser')
+    root = parse(html)
     links = []
-    for article in soup.select('div.flex.flex-col.gap-2 a[href*="/archive/"]'):
+    for article in root.select('div.flex.flex-col.gap-2 a[href*="/archive/"]'):
         href = article.get('href')
         full_url = urljoin(BASE_URL, href)
         links.append(full_url)
     return list(set(links))
 
-def extract_newsletter_content(url):
-    with sync_playwright() as p:
-        browser = p.chromium.launch()
-        page = browser.new_page()
+def extract_newsletter_content(url, context=None):
+    """Extract one newsletter, in a tab of the given browser context (one is opened when missing)"""
+    if context is None:
+        return extract_newsletters([url])[0]
+
+    page = context.new_page()
+    try:
         page.goto(url)
-        page.wait_for_timeout(2000)
+        Readiness(selector='h1.text-4xl').wait(page)
         html = page.content()
-        browser.close()
+    finally:
+        page.close()
 
-    soup = BeautifulSoup(html, 'html.parser')
+    root = parse(html)
     
-    title = soup.select_one('h1.text-4xl').get_text(strip=True)
+    title = root.select_one('h1.text-4xl').get_text(strip=True)
     # Extract date from metadata (example: "Dec 23, 2024")
-    date = soup.select_one('time').get_text(strip=True) if soup.select_one('time') else 'No Date'
-    content = '\n'.join([p.get_text(strip=True) for p in soup.select('div.prose p')])
+    date = root.select_one('time').get_text(strip=True) if root.select_one('time') else 'No Date'
+    content = '\n'.join([p.get_text(strip=True) for p in root.select('div.prose p')])
     
-    return {'title': title, 'date': date, 'content': content, 'url': url}
\ No newline at end of file
+    return {'title': title, 'date': date, 'content': content, 'url': url}
+
+def extract_newsletters(urls):
+    """Extract many newsletters, paying for Playwright startup and the browser launch once"""
+    with sync_playwright() as p, open_browser(p, "chromium", headless=True) as context:
+        return [extract_newsletter_content(url, context) for url in urls]
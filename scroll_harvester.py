@@ -0,0 +1,86 @@
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from rate_limiter import domain_of
+
+# Installs window.__harvest: a MutationObserver records each card once as it renders
+# and then empties it (pinning its height) so long lists keep a small DOM.
+# %s is replaced with the extract function source, which runs on each card element.
+INSTALL_SCRIPT = """
+    (cfg) => {
+        const extract = %s;
+        const state = { items: [], seen: new Set() };
+        const harvest = () => {
+            document.querySelectorAll(cfg.itemSelector).forEach(el => {
+                if (el.dataset.harvested) return;
+                const data = extract(el);
+                if (!data) return;
+                el.dataset.harvested = '1';
+                const key = data[cfg.key];
+                if (state.seen.has(key)) return;
+                state.seen.add(key);
+                state.items.push(data);
+                if (cfg.detach) {
+                    const target = typeof cfg.detach === 'string' ? (el.closest(cfg.detach) || el) : el;
+                    target.style.height = target.offsetHeight + 'px';
+                    target.replaceChildren();
+                }
+            });
+        };
+        harvest();
+        new MutationObserver(harvest).observe(document.body, { childList: true, subtree: true });
+        window.__harvest = state;
+        return state.items.length;
+    }
+"""
+
+
+class ScrollHarvester:
+    """Scrolls an infinite list, extracting cards in the page as they appear
+
+    Stops once `stable_scrolls` scrolls in a row add no new items (or after
+    `max_scrolls`) and returns the items deduplicated on `key`, in page order.
+    """
+
+    def __init__(self, item_selector, extract, key='url', stable_scrolls=2, max_scrolls=200,
+                 settle_ms=4000, detach=True, rate_limiter=None):
+        self.item_selector = item_selector
+        # JS function source taking one card element and returning a dict, or null to skip it
+        self.extract = extract
+        self.key = key
+        self.stable_scrolls = stable_scrolls
+        self.max_scrolls = max_scrolls
+        self.settle_ms = settle_ms
+        # True empties each harvested card; a CSS selector empties its closest matching ancestor
+        self.detach = detach
+        # Each scroll fetches the next batch, so it can be paced like a request
+        self.rate_limiter = rate_limiter
+
+    def count(self, page):
+        return page.evaluate("() => window.__harvest.items.length")
+
+    def harvest(self, page):
+        """Scroll the page until the list stops growing and return the harvested items"""
+        count = page.evaluate(INSTALL_SCRIPT % self.extract, {
+            'itemSelector': self.item_selector,
+            'key': self.key,
+            'detach': self.detach
+        })
+        stable = 0
+        scrolls = 0
+
+        while stable < self.stable_scrolls and scrolls < self.max_scrolls:
+            if self.rate_limiter:
+                self.rate_limiter.acquire_sync(domain_of(page.url))
+            page.evaluate("window.scrollTo(0, document.documentElement.scrollHeight)")
+            scrolls += 1
+            try:
+                page.wait_for_function("n => window.__harvest.items.length > n", arg=count,
+                                       timeout=self.settle_ms, polling=200)
+            except PlaywrightTimeoutError:
+                pass
+
+            new_count = self.count(page)
+            stable = stable + 1 if new_count == count else 0
+            count = new_count
+            print(f"Scroll {scrolls}: {count} items")
+
+        return page.evaluate("() => window.__harvest.items")
@@ -0,0 +1,317 @@
+import json
+from urllib.parse import urljoin
+from playwright.sync_api import sync_playwright
+from browser_service import open_browser
+from article_pool import ArticlePool, ArticleJob
+from resource_policy import ResourcePolicy
+from substack import SubstackArchive
+from scroll_harvester import ScrollHarvester
+from readiness import Readiness
+from page_parser import parse
+
+# Extracts one listing card; %s is replaced with the spec's link/title config
+CARD_EXTRACT = """
+    card => {
+        const cfg = %s;
+        const link = card.matches(cfg.link) ? card : card.querySelector(cfg.link);
+        if (!link || !link.href) return null;
+        if (cfg.contains && !link.href.includes(cfg.contains)) return null;
+        if (cfg.excludes.some(suffix => link.href.endsWith(suffix))) return null;
+        const title = cfg.title ? card.querySelector(cfg.title) : null;
+        return { title: (title || link).innerText.trim() || card.innerText.trim() || 'Untitled', url: link.href };
+    }
+"""
+
+# Last resort when no card matched: every qualifying link on the listing page, deduplicated
+FALLBACK_LINKS_SCRIPT = """
+    (cfg) => {
+        const articles = new Map();
+        cfg.selectors.forEach(selector => {
+            document.querySelectorAll(selector).forEach(element => {
+                const href = element.href;
+                if (!href || (cfg.contains && !href.includes(cfg.contains))) return;
+                if (cfg.excludes.some(suffix => href.endsWith(suffix)) || articles.has(href)) return;
+                articles.set(href, { title: element.innerText.trim() || 'Untitled', url: href });
+            });
+        });
+        return Array.from(articles.values());
+    }
+"""
+
+# Reads the fields of an article page; %s is replaced with the spec's normalised fields
+FIELDS_EXTRACT = """
+    () => {
+        const fields = %s;
+        // Images are usually blocked by the resource policy, so sizes come from the markup
+        const image = img => ({
+            src: img.src,
+            alt: img.alt || '',
+            width: img.getAttribute('width') || img.naturalWidth || '',
+            height: img.getAttribute('height') || img.naturalHeight || '',
+            title: img.title || ''
+        });
+        const result = {};
+        for (const [name, field] of Object.entries(fields)) {
+            if (field.image) {
+                const found = field.css.flatMap(css => Array.from(document.querySelectorAll(css)));
+                result[name] = field.many ? found.map(image) : (found.length ? image(found[0]) : null);
+                continue;
+            }
+            let value = '';
+            for (const css of field.css) {
+                const el = document.querySelector(css);
+                value = el ? (field.attr ? el.getAttribute(field.attr) || '' : el.innerText.trim()) : '';
+                if (value) break;
+            }
+            result[name] = value;
+        }
+        return result;
+    }
+"""
+
+
+def normalise_field(field):
+    """A field is a selector, a list of selectors tried in order, or a dict with css plus attr/image/many"""
+    if isinstance(field, (str, list)):
+        field = {'css': field}
+    css = field['css']
+    return {
+        'css': [css] if isinstance(css, str) else list(css),
+        'attr': field.get('attr'),
+        'image': field.get('image', False),
+        'many': field.get('many', False),
+    }
+
+
+class SiteSpec:
+    """Declarative description of one newsletter source for the SiteScraper engine
+
+    listing: strategies tried in order until one finds articles
+        'substack_api' - the publication's JSON archive, bodies included
+        'scroll'       - scroll listing_url, harvesting item_selector cards
+    fields: name -> field (see normalise_field); content/date/author/images/header_image
+        feed the output record, extra fields are kept under 'extra'
+    post: name -> callable(value, article) run on each extracted field
+    """
+
+    def __init__(self, name, base_url, fields, source=None, listing_url=None, listing=('scroll',),
+                 item_selector='h3', link_selector='a', title_selector=None, link_contains='/p/',
+                 link_excludes=(), fallback_selectors=(), detach=None, listing_ready=None,
+                 dismiss_selectors=(), wait_for='article', required=('content',), defaults=None,
+                 post=None, categories=(), output=None, browser_type='firefox', resource_policy=None):
+        self.name = name
+        self.source = source or name
+        self.base_url = base_url
+        self.listing_url = listing_url or base_url
+        self.listing = list(listing)
+        self.item_selector = item_selector
+        self.link_selector = link_selector
+        self.title_selector = title_selector
+        self.link_contains = link_contains
+        self.link_excludes = list(link_excludes)
+        self.fallback_selectors = list(fallback_selectors)
+        # Card element (True) or closest ancestor selector to empty once harvested
+        self.detach = detach if detach is not None else True
+        # Readiness arguments for the listing page
+        self.listing_ready = listing_ready or {'selector': item_selector, 'network_idle': True}
+        # Popup close buttons tried on the listing page
+        self.dismiss_selectors = list(dismiss_selectors)
+        self.wait_for = wait_for
+        self.fields = {name: normalise_field(field) for name, field in fields.items()}
+        self.required = list(required)
+        self.defaults = defaults or {}
+        self.post = post or {}
+        self.categories = list(categories)
+        self.output = output or f"{name.lower()}_newsletters.json"
+        self.browser_type = browser_type
+        # ResourcePolicy arguments
+        self.resource_policy = resource_policy or {}
+        self._card_extract = None
+        self._fields_extract = None
+
+    @property
+    def card_extract(self):
+        """The listing card extractor, compiled once"""
+        if self._card_extract is None:
+            self._card_extract = CARD_EXTRACT % json.dumps({
+                'link': self.link_selector,
+                'title': self.title_selector,
+                'contains': self.link_contains,
+                'excludes': self.link_excludes,
+            })
+        return self._card_extract
+
+    @property
+    def fields_extract(self):
+        """The article field extractor, compiled once and injected into every article page"""
+        if self._fields_extract is None:
+            self._fields_extract = FIELDS_EXTRACT % json.dumps(self.fields)
+        return self._fields_extract
+
+    def parse(self, html, url):
+        """The same fields read from server-rendered HTML (HTTP path); None when a required field is empty"""
+        root = parse(html)
+
+        def image(img):
+            return {
+                "src": urljoin(url, img.get('src', '')),
+                "alt": img.get('alt', ''),
+                "width": img.get('width', ''),
+                "height": img.get('height', ''),
+                "title": img.get('title', '')
+            }
+
+        result = {}
+        for name, field in self.fields.items():
+            if field['image']:
+                found = [img for css in field['css'] for img in root.select(css)]
+                result[name] = [image(img) for img in found] if field['many'] else (image(found[0]) if found else None)
+                continue
+            value = ''
+            for css in field['css']:
+                el = root.select_one(css)
+                value = (el.get(field['attr']) or '' if field['attr'] else el.get_text(separator='\n', strip=True)) if el else ''
+                if value:
+                    break
+            result[name] = value
+
+        return result if self.complete(result) else None
+
+    def complete(self, data):
+        """Whether extracted fields, from either path, fill every required field"""
+        return all(data.get(name) for name in self.required)
+
+    def finish(self, data, article):
+        """Fill empty fields from the listing, then apply post-processors and defaults"""
+        # The Substack API listing carries the real byline, which the synthesized article HTML lacks
+        for name in self.fields:
+            if not data.get(name) and article.get(name):
+                data[name] = article[name]
+        for name, post in self.post.items():
+            data[name] = post(data.get(name), article)
+        for name, default in self.defaults.items():
+            data[name] = data.get(name) or default
+        return data
+
+
+class SiteScraper:
+    """Runs a SiteSpec: lists its articles, then extracts them concurrently over an ArticlePool
+
+    Articles are fetched over HTTP first with the spec's parser and fall back to
+    a browser tab running the compiled field extractor.
+    """
+
+    RECORD_FIELDS = ('content', 'date', 'author', 'images', 'header_image')
+
+    def __init__(self, spec, concurrency=4, output=None, listing=None):
+        self.spec = spec
+        self.output = output or spec.output
+        # Overrides the spec's listing strategies
+        self.listing = listing or spec.listing
+        self.resource_policy = ResourcePolicy(**spec.resource_policy)
+        self.pool = ArticlePool(browser_type=spec.browser_type, concurrency=concurrency, per_domain=concurrency,
+                                http_ok=True, resource_policy=self.resource_policy)
+
+    def list_articles(self):
+        for strategy in self.listing:
+            try:
+                articles = getattr(self, f"list_{strategy}")()
+            except Exception as e:
+                print(f"{self.spec.name}: listing by {strategy} failed: {str(e)}")
+                continue
+            if articles:
+                print(f"{self.spec.name}: found {len(articles)} articles by {strategy}")
+                return articles
+        return []
+
+    def list_substack_api(self):
+        return SubstackArchive(self.spec.base_url, include_bodies=True).run()
+
+    def dismiss_popups(self, page):
+        for selector in self.spec.dismiss_selectors:
+            try:
+                if page.locator(selector).is_visible(timeout=5000):
+                    page.click(selector)
+                    page.locator(selector).wait_for(state="hidden", timeout=5000)
+                    return
+            except Exception as e:
+                print(f"No popup found or error handling popup: {str(e)}")
+
+    def list_scroll(self):
+        with sync_playwright() as p, open_browser(p, self.spec.browser_type) as context:
+            page = context.new_page()
+            self.resource_policy.install(page)
+
+            try:
+                print(f"Accessing: {self.spec.listing_url}")
+                page.goto(self.spec.listing_url)
+                Readiness(**self.spec.listing_ready).wait(page)
+                self.dismiss_popups(page)
+
+                # Scroll to load all content, collecting articles as they render
+                print("Loading all articles...")
+                articles = ScrollHarvester(self.spec.item_selector, extract=self.spec.card_extract,
+                                           detach=self.spec.detach,
+                                           rate_limiter=self.pool.rate_limiter).harvest(page)
+
+                if not articles and self.spec.fallback_selectors:
+                    print("Trying alternative selectors...")
+                    articles = page.evaluate(FALLBACK_LINKS_SCRIPT, {
+                        'selectors': self.spec.fallback_selectors,
+                        'contains': self.spec.link_contains,
+                        'excludes': self.spec.link_excludes
+                    })
+                return articles
+
+            finally:
+                page.close()
+
+    def parse_article(self, html, url):
+        return self.spec.parse(html, url)
+
+    def record(self, idx, article, data):
+        data = self.spec.finish(data, article)
+        record = {
+            "newsletter_id": idx,
+            "source": self.spec.source,
+            "title": article['title'],
+            "publication_date": data.get('date') or article.get('date', ''),
+            "content": data.get('content', ''),
+            "author": data.get('author', ''),
+            "url": article['url'],
+            "categories": self.spec.categories,
+            "sentiment": 0.0,
+            "entities": [],
+            "featured_image": data.get('header_image'),
+            "content_images": data.get('images') or []
+        }
+        extra = {name: value for name, value in data.items() if name not in self.RECORD_FIELDS}
+        if extra:
+            record["extra"] = extra
+        return record
+
+    def scrape_articles(self, articles):
+        jobs = [ArticleJob(article['url'], script=self.spec.fields_extract, wait_for=self.spec.wait_for,
+                           parse=self.parse_article, html=article.get('html'))
+                for article in articles]
+
+        print(f"Scraping {len(jobs)} articles with {self.pool.concurrency} tabs...")
+        results = self.pool.run(jobs)
+
+        newsletters = []
+        for idx, (article, data) in enumerate(zip(articles, results), 1):
+            # The HTTP path already dropped incomplete pages; the browser extractor returns them as is
+            if not data or not self.spec.complete(data):
+                print(f"Skipping article {idx}/{len(articles)}: {article['url']}")
+                continue
+            newsletters.append(self.record(idx, article, data))
+            print(f"Successfully scraped: {article['title']}")
+
+        with open(self.output, "w", encoding="utf-8") as f:
+            json.dump(newsletters, f, indent=2, ensure_ascii=False)
+
+        print(f"\nSuccessfully scraped {len(newsletters)} newsletters from {self.spec.name}!")
+        return newsletters
+
+    def run(self):
+        return self.scrape_articles(self.list_articles())
@@ -0,0 +1,99 @@
+from site_spec import SiteSpec
+
+# Article fields shared by the Substack-style publications
+SUBSTACK_FIELDS = {
+    "content": ["article", ".post-content"],
+    "date": {"css": "time", "attr": "datetime"},
+    "author": [".author-name", ".writer-name", '[data-component="post-author-name"]'],
+    "images": {"css": "article img, .post-content img", "image": True, "many": True},
+    "header_image": {"css": ".post-feature-image img, article header img", "image": True},
+}
+
+# Links tried when no h3 card matched on an archive page
+SUBSTACK_FALLBACK_SELECTORS = [
+    'a[href*="/p/"]',
+    '.post-preview a',
+    '[data-component="post-preview"] a',
+    '.post-preview-title',
+]
+
+DECENTRALISED = SiteSpec(
+    "Decentralised",
+    "https://www.decentralised.co",
+    source="Decentralised.co",
+    listing_url="https://www.decentralised.co/archive",
+    listing=["substack_api", "scroll"],
+    detach="div.post-preview",
+    fallback_selectors=SUBSTACK_FALLBACK_SELECTORS,
+    fields=SUBSTACK_FIELDS,
+    defaults={"author": "Decentralised Team"},
+    categories=["blockchain", "crypto", "web3"],
+    output="newsletters.json",
+)
+
+UNCHAINED = SiteSpec(
+    "Unchained",
+    "https://unchainedcrypto.substack.com",
+    source="unchain",
+    listing_url="https://unchainedcrypto.substack.com/archive",
+    listing=["substack_api", "scroll"],
+    detach="div.post-preview",
+    link_excludes=["/comments"],
+    fallback_selectors=SUBSTACK_FALLBACK_SELECTORS,
+    fields=SUBSTACK_FIELDS,
+    defaults={"author": "unchain Team"},
+    categories=["blockchain", "crypto", "web3"],
+    output="unchained_newsletters.json",
+)
+
+SHOAL = SiteSpec(
+    "Shoal",
+    "https://www.shoal.gg",
+    listing_url="https://www.shoal.gg/archive",
+    listing=["substack_api", "scroll"],
+    detach="div.post-preview",
+    fallback_selectors=SUBSTACK_FALLBACK_SELECTORS,
+    fields=SUBSTACK_FIELDS,
+    defaults={"author": "Shoal Team"},
+    categories=["blockchain", "crypto", "web3"],
+    output="shoal.json",
+)
+
+MILKROAD = SiteSpec(
+    "Milkroad",
+    "https://milkroad.com",
+    listing_url="https://milkroad.com/daily",
+    listing_ready={"selector": "h3", "network_idle": True, "idle_cap": 10000},
+    dismiss_selectors=[
+        'button[aria-label="Close"]',
+        '.modal-close',
+        '.close-button',
+        'button.close',
+        'button.CloseButton__ButtonElement-sc-79mh24-0',
+    ],
+    fallback_selectors=SUBSTACK_FALLBACK_SELECTORS,
+    fields=SUBSTACK_FIELDS,
+    defaults={"author": "Milkroad Team"},
+    categories=["crypto", "web3", "newsletter"],
+    output="milkroad_newsletters.json",
+)
+
+BEACONS_BLOG = SiteSpec(
+    "Beacons",
+    "https://beacons.ai",
+    listing_url="https://beacons.ai/i/beacons-blog",
+    item_selector=".blog-post-card",
+    link_contains=None,
+    wait_for=".blog-post-content",
+    fields={
+        "content": ".blog-post-content",
+        "date": {"css": ".blog-post-date", "attr": "datetime"},
+        "author": ".blog-post-author",
+        "images": {"css": ".blog-post-content img", "image": True, "many": True},
+    },
+    defaults={"author": "Beacons Team"},
+    categories=["beacons", "creator-economy"],
+)
+
+# Every source the engine knows, by lower-case name
+SPECS = {spec.name.lower(): spec for spec in (DECENTRALISED, UNCHAINED, SHOAL, MILKROAD, BEACONS_BLOG)}
@@ -0,0 +1,250 @@
+import sys
+import time
+import asyncio
+from collections import Counter
+from telethon import TelegramClient
+from telethon.errors import FloodWaitError
+from media_downloader import MediaDownloader
+from telegram_store import SyncState, MessageStore, SyncedRange
+from ts import API_ID, API_HASH, GROUP_USERNAME, TelegramScraper, message_record
+
+# Messages per GetHistoryRequest; 100 is the server maximum
+PAGE_SIZE = 100
+
+
+class FloodScheduler:
+    """Spaces out Telegram API calls per method and parks every caller of a method during its FloodWait
+
+    Only FloodWaits above the client's flood_sleep_threshold reach it; Telethon
+    sleeps through shorter ones. Each method's interval doubles on a FloodWait
+    and decays slowly on success, settling near the fastest rate the server accepts across all channels.
+    A call that keeps drawing FloodWaits is given up after max_flood_waits of them or
+    max_flood_seconds of waiting, and the FloodWaitError is raised to its caller.
+    """
+
+    def __init__(self, concurrency=3, min_interval=0.0, max_interval=10.0, decay=0.95,
+                 max_flood_waits=5, max_flood_seconds=1800):
+        self.slots = asyncio.Semaphore(concurrency)
+        self.max_flood_waits = max_flood_waits
+        self.max_flood_seconds = max_flood_seconds
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.decay = decay
+        self.intervals = {}
+        self.next_call = {}
+        self.blocked_until = {}
+        self.flood_waits = Counter()
+        self.flood_seconds = Counter()
+        self.calls = Counter()
+
+    async def _wait_turn(self, method):
+        while True:
+            now = time.monotonic()
+            ready = max(self.blocked_until.get(method, 0), self.next_call.get(method, 0))
+            if ready <= now:
+                self.next_call[method] = now + self.intervals.get(method, self.min_interval)
+                return
+            await asyncio.sleep(ready - now)
+
+    async def call(self, client, request):
+        """Send a raw request, scheduled under its type name"""
+        return await self.run(type(request).__name__, lambda: client(request))
+
+    async def run(self, method, make_call):
+        """Await make_call() (called afresh on every retry) under the method's schedule"""
+        waits = waited = 0
+        while True:
+            await self._wait_turn(method)
+            async with self.slots:
+                try:
+                    result = await make_call()
+                except FloodWaitError as e:
+                    waits += 1
+                    waited += e.seconds
+                    self.flood_waits[method] += 1
+                    self.flood_seconds[method] += e.seconds
+                    self.blocked_until[method] = time.monotonic() + e.seconds + 1
+                    self.intervals[method] = min(self.max_interval,
+                                                 max(0.5, self.intervals.get(method, 0) * 2))
+                    print(f"FloodWait on {method}: {e.seconds}s, interval now {self.intervals[method]:.2f}s")
+                    if waits >= self.max_flood_waits or waited >= self.max_flood_seconds:
+                        raise
+                    continue
+
+            self.calls[method] += 1
+            self.intervals[method] = max(self.min_interval, self.intervals.get(method, 0) * self.decay)
+            return result
+
+
+class ChannelProgress:
+    def __init__(self, channel):
+        self.channel = channel
+        self.status = 'pending'
+        self.messages = 0
+        self.requests = 0
+        self.started = None
+        self.finished = None
+
+    def as_dict(self):
+        elapsed = ((self.finished or time.monotonic()) - self.started) if self.started else 0
+        return {
+            'channel': self.channel,
+            'status': self.status,
+            'messages': self.messages,
+            'requests': self.requests,
+            'elapsed': round(elapsed, 1),
+            'messages_per_second': round(self.messages / elapsed, 1) if elapsed else 0.0
+        }
+
+
+class TelegramCrawler:
+    """Crawls many channels concurrently on one client, sharing a FloodWait-aware scheduler"""
+
+    def __init__(self, channels, mode='incremental', concurrency=3, media_concurrency=4):
+        # Telethon keeps absorbing short FloodWaits (under flood_sleep_threshold) on every call,
+        # including get_input_entity and media downloads; longer ones surface to the scheduler
+        self.client = TelegramClient('scraper_session', API_ID, API_HASH)
+        self.channels = channels
+        self.mode = mode
+        self.scheduler = FloodScheduler(concurrency=concurrency)
+        self.media_concurrency = media_concurrency
+        self.state = SyncState()
+        self.stores = {channel: MessageStore(channel) for channel in channels}
+        self.progress = {channel: ChannelProgress(channel) for channel in channels}
+        self.started = None
+
+    def metrics(self):
+        """Per-channel progress plus totals and the scheduler's FloodWait record"""
+        elapsed = time.monotonic() - self.started if self.started else 0
+        total = sum(progress.messages for progress in self.progress.values())
+        return {
+            'channels': [progress.as_dict() for progress in self.progress.values()],
+            'messages': total,
+            'messages_per_second': round(total / elapsed, 1) if elapsed else 0.0,
+            'calls': dict(self.scheduler.calls),
+            'flood_waits': dict(self.scheduler.flood_waits),
+            'flood_wait_seconds': dict(self.scheduler.flood_seconds)
+        }
+
+    def print_metrics(self):
+        metrics = self.metrics()
+        print(f"\n{metrics['messages']} messages at {metrics['messages_per_second']}/s, "
+              f"flood waits: {metrics['flood_waits'] or 'none'}")
+        for channel in metrics['channels']:
+            print(f"  {channel['channel']}: {channel['status']}, {channel['messages']} messages, "
+                  f"{channel['messages_per_second']}/s")
+
+    async def report_periodically(self, interval=15):
+        while True:
+            await asyncio.sleep(interval)
+            self.print_metrics()
+
+    async def fetch_page(self, channel, peer, offset_id, reverse):
+        """One page of history next to offset_id: older messages, or newer ones oldest first with reverse"""
+        # At PAGE_SIZE get_messages is a single GetHistoryRequest, and its messages come back
+        # ready to use (file, text, download_media)
+        page = await self.scheduler.run('GetHistoryRequest', lambda: self.client.get_messages(
+            peer, limit=PAGE_SIZE, offset_id=offset_id, reverse=reverse
+        ))
+        self.progress[channel].requests += 1
+        return list(page)
+
+    def pages(self, channel, peer):
+        """Yield pages of messages for the crawl mode, in the order they can be checkpointed"""
+        params = TelegramScraper(channel, client=self.client, state=self.state).history_params(self.mode)
+
+        async def newer(offset_id):
+            # Pages upward from the high-water mark, oldest first
+            while True:
+                page = await self.fetch_page(channel, peer, offset_id, reverse=True)
+                if not page:
+                    return
+                yield page
+                offset_id = page[-1].id
+
+        async def older(offset_id):
+            # Pages downward, newest first
+            while True:
+                page = await self.fetch_page(channel, peer, offset_id, reverse=False)
+                if not page:
+                    return
+                yield page
+                offset_id = min(m.id for m in page)
+
+        if 'min_id' in params:
+            return newer(params['min_id'])
+        return older(params.get('offset_id', 0))
+
+    async def crawl_channel(self, channel, downloader):
+        progress = self.progress[channel]
+        store = self.stores[channel]
+        progress.status = 'running'
+        progress.started = time.monotonic()
+
+        # The saved range only moves past a message once its media is on disk
+        synced = SyncedRange(self.state, channel)
+
+        def media_done(record):
+            store.append(record)
+            synced.done(record['id'])
+
+        try:
+            peer = await self.client.get_input_entity(channel)
+            async for page in self.pages(channel, peer):
+                for message in page:
+                    msg_data = message_record(message)
+                    queued = bool(message.media) and await downloader.submit(message, msg_data,
+                                                                             on_complete=media_done)
+                    store.append(msg_data)
+                    synced.add(message.id, pending=queued)
+                    progress.messages += 1
+
+                # Checkpoint after every page
+                store.sync()
+                self.state.save()
+            progress.status = 'done'
+
+        except Exception as e:
+            progress.status = f'error: {str(e)}'
+            print(f"Error crawling {channel}: {str(e)}")
+
+        finally:
+            progress.finished = time.monotonic()
+            store.sync()
+            self.state.save()
+
+    async def crawl(self):
+        await TelegramScraper(self.channels[0], client=self.client).connect()
+        self.started = time.monotonic()
+        reporter = asyncio.create_task(self.report_periodically())
+
+        try:
+            async with MediaDownloader(self.client, concurrency=self.media_concurrency) as downloader:
+                await asyncio.gather(*(self.crawl_channel(channel, downloader) for channel in self.channels))
+        finally:
+            reporter.cancel()
+            # Downloads finishing after their channel's last page moved the range on since
+            for store in self.stores.values():
+                store.sync()
+            self.state.save()
+
+        for store in self.stores.values():
+            store.compact()
+        self.print_metrics()
+        await self.client.disconnect()
+        return self.metrics()
+
+
+async def main():
+    # python telegram_crawler.py [incremental|backfill] channel [channel ...]
+    args = sys.argv[1:]
+    mode = 'incremental'
+    if args and args[0] in ('incremental', 'backfill'):
+        mode = args.pop(0)
+
+    crawler = TelegramCrawler(args or [GROUP_USERNAME], mode=mode)
+    await crawler.crawl()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
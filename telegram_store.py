@@ -0,0 +1,139 @@
+import json
+import os
+import time
+from collections import deque
+
+STATE_FILE = 'telegram_state.json'
+
+
+def write_json_atomic(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class SyncState:
+    """Per-channel range of message ids already stored, persisted between runs
+
+    The store always holds every message between min_id and max_id, so new
+    messages resume above max_id and backfill continues below min_id.
+    """
+
+    def __init__(self, path=STATE_FILE):
+        self.path = path
+        self.channels = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.channels = json.load(f)
+
+    def get(self, channel):
+        return self.channels.get(channel)
+
+    def update(self, channel, message_id):
+        state = self.channels.setdefault(channel, {'min_id': message_id, 'max_id': message_id})
+        state['min_id'] = min(state['min_id'], message_id)
+        state['max_id'] = max(state['max_id'], message_id)
+
+    def save(self):
+        write_json_atomic(self.path, self.channels)
+
+
+class SyncedRange:
+    """Feeds one channel's SyncState in the order messages were fetched, holding back at the
+    first message whose media is still downloading, so the saved range never covers a
+    message a crash would leave without its media"""
+
+    def __init__(self, state, channel):
+        self.state = state
+        self.channel = channel
+        self.order = deque()
+        self.pending = set()
+
+    def add(self, message_id, pending=False):
+        self.order.append(message_id)
+        if pending:
+            self.pending.add(message_id)
+        self.advance()
+
+    def done(self, message_id):
+        """The message's media has finished (or failed for good)"""
+        self.pending.discard(message_id)
+        self.advance()
+
+    def advance(self):
+        while self.order and self.order[0] not in self.pending:
+            self.state.update(self.channel, self.order.popleft())
+
+
+class MessageStore:
+    """Append-only NDJSON journal of messages per channel, compacted into one JSON file
+
+    Records are written as they are produced, so memory stays flat during a
+    crawl. A message may be appended more than once (e.g. again once its media
+    has downloaded); compaction keeps the last copy of each id.
+    """
+
+    def __init__(self, channel, directory='.', fsync_every=100, fsync_interval=5):
+        self.path = os.path.join(directory, f'{channel}_messages.json')
+        self.journal_path = os.path.join(directory, f'{channel}_messages.ndjson')
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.journal = None
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def _ends_with_newline(self):
+        with open(self.journal_path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def append(self, record):
+        if self.journal is None:
+            self.journal = open(self.journal_path, 'a', encoding='utf-8')
+            # Terminate a line torn by a previous crash so it cannot swallow this record
+            if self.journal.tell() and not self._ends_with_newline():
+                self.journal.write('\n')
+        self.journal.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.unsynced += 1
+        if self.unsynced >= self.fsync_every or time.monotonic() - self.last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        """Flush the journal to disk"""
+        if self.journal is None:
+            return
+        self.journal.flush()
+        os.fsync(self.journal.fileno())
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def close(self):
+        if self.journal is not None:
+            self.sync()
+            self.journal.close()
+            self.journal = None
+
+    def compact(self):
+        """Merge the journal into the canonical JSON file and remove the journal"""
+        self.close()
+        messages = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                messages = {message['id']: message for message in json.load(f)}
+
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A crash can leave a torn final line
+                        continue
+                    messages[record['id']] = record
+
+        # Newest first, like the channel itself
+        write_json_atomic(self.path, sorted(messages.values(), key=lambda m: m['id'], reverse=True))
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        print(f"Compacted {len(messages)} messages into {self.path}")
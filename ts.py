@@ -1,9 +1,9 @@
-from telethon import TelegramClient, events
+from telethon import TelegramClient, events, utils
 from telethon.tl.functions.messages import GetHistoryRequest
-import json
-import os
-from datetime import datetime
+import sys
 import asyncio
+from media_downloader import MediaDownloader
+from telegram_store import SyncState, MessageStore, SyncedRange
 
 # Your Telegram API credentials
 # Get these from https://my.telegram.org/auth
@@ -12,9 +12,24 @@ API_HASH = 'your_api_hash'
 PHONE = 'your_phone_number'  # Your phone number with country code
 GROUP_USERNAME = 'joescrypt'  # The group username without @ symbol
 
+def message_record(message):
+    return {
+        'id': message.id,
+        'date': message.date.isoformat(),
+        'edit_date': message.edit_date.isoformat() if message.edit_date else None,
+        'text': message.text,
+        'views': message.views,
+        'forwards': message.forwards,
+        'reply_to_msg_id': message.reply_to_msg_id,
+    }
+
 class TelegramScraper:
-    def __init__(self):
-        self.client = TelegramClient('scraper_session', API_ID, API_HASH)
+    def __init__(self, channel=GROUP_USERNAME, client=None, state=None, store=None):
+        # A client, state and store can be shared with a listener or crawler driving several channels
+        self.client = client or TelegramClient('scraper_session', API_ID, API_HASH)
+        self.channel = channel
+        self.state = state or SyncState()
+        self.store = store or MessageStore(channel)
         
     async def connect(self):
         await self.client.start()
@@ -22,68 +37,161 @@ class TelegramScraper:
             await self.client.send_code_request(PHONE)
             await self.client.sign_in(PHONE, input('Enter the code: '))
     
-    async def scrape_messages(self, limit=None):
-        messages = []
+    def history_params(self, mode):
+        """iter_messages arguments for a sync mode: 'incremental' (new messages) or 'backfill' (older ones)"""
+        state = self.state.get(self.channel)
+        if not state:
+            # First run: newest first, so an interrupted run can be finished by backfill
+            return {}
+        if mode == 'backfill':
+            return {'offset_id': state['min_id']}
+        # Oldest first above the high-water mark, so the mark can advance as we go
+        return {'min_id': state['max_id'], 'reverse': True}
+    
+    async def scrape_messages(self, limit=None, mode='incremental', media_concurrency=4):
+        """Stream messages into the store and return how many were synced"""
+        count = 0
         
         try:
-            channel = await self.client.get_entity(GROUP_USERNAME)
+            channel = await self.client.get_entity(self.channel)
+            params = self.history_params(mode)
+            print(f"Syncing {self.channel} ({mode}): {params or 'full history'}")
             
-            # Get messages
-            async for message in self.client.iter_messages(channel, limit=limit):
-                msg_data = {
-                    'id': message.id,
-                    'date': message.date.isoformat(),
-                    'text': message.text,
-                    'views': message.views,
-                    'forwards': message.forwards,
-                    'reply_to_msg_id': message.reply_to_msg_id,
-                }
-                
-                # Handle media
-                if message.media:
-                    if hasattr(message.media, 'photo'):
-                        msg_data['media_type'] = 'photo'
-                        # Download photos to a directory
-                        path = f'downloads/photos/{message.id}.jpg'
-                        os.makedirs(os.path.dirname(path), exist_ok=True)
-                        await message.download_media(path)
-                        msg_data['media_path'] = path
-                    elif hasattr(message.media, 'document'):
-                        msg_data['media_type'] = 'document'
-                        # Download documents to a directory
-                        path = f'downloads/documents/{message.id}_{message.file.name}'
-                        os.makedirs(os.path.dirname(path), exist_ok=True)
-                        await message.download_media(path)
-                        msg_data['media_path'] = path
-                
-                messages.append(msg_data)
-                print(f"Scraped message {message.id}")
-                
-                # Save progress periodically
-                if len(messages) % 100 == 0:
-                    self.save_messages(messages)
+            # Media downloads run in the background while iteration continues
+            # and re-append each record once its media_bytes are known; the synced
+            # range only moves past a message once its media is done
+            synced = SyncedRange(self.state, self.channel)
             
-            return messages
+            def media_done(record):
+                self.store.append(record)
+                synced.done(record['id'])
+            
+            async with MediaDownloader(self.client, concurrency=media_concurrency,
+                                       on_complete=media_done) as downloader:
+                async for message in self.client.iter_messages(channel, limit=limit, **params):
+                    msg_data = message_record(message)
+                    
+                    # Handle media
+                    queued = bool(message.media) and await downloader.submit(message, msg_data)
+                    
+                    self.store.append(msg_data)
+                    synced.add(message.id, pending=queued)
+                    count += 1
+                    print(f"Scraped message {message.id}")
+                    
+                    # Checkpoint the synced id range once the journal is on disk
+                    if count % 100 == 0:
+                        self.checkpoint()
+            
+            return count
             
         except Exception as e:
             print(f"Error scraping messages: {str(e)}")
-            return messages
+            return count
+        
+        finally:
+            self.checkpoint()
+    
+    def checkpoint(self):
+        self.store.sync()
+        self.state.save()
+
+class TelegramListener:
+    """Streams new and edited messages from several channels into their stores as they arrive
+
+    Each (re)connection first catches every channel up from its persisted
+    high-water mark; live events wait for that, so no gap is ever skipped.
+    """
     
-    def save_messages(self, messages):
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'joescrypt_messages_{timestamp}.json'
+    def __init__(self, channels, media_concurrency=4):
+        self.client = TelegramClient('scraper_session', API_ID, API_HASH)
+        self.channels = channels
+        self.media_concurrency = media_concurrency
+        self.state = SyncState()
+        self.stores = {channel: MessageStore(channel) for channel in channels}
+        self.synced = {channel: SyncedRange(self.state, channel) for channel in channels}
+        # Peer id -> channel name, filled in once the entities are resolved
+        self.peers = {}
+        self.caught_up = asyncio.Event()
+        self.downloader = None
+    
+    def scraper(self, channel):
+        return TelegramScraper(channel, client=self.client, state=self.state, store=self.stores[channel])
+    
+    async def catch_up(self):
+        self.caught_up.clear()
+        for channel in self.channels:
+            count = await self.scraper(channel).scrape_messages(mode='incremental',
+                                                                media_concurrency=self.media_concurrency)
+            print(f"Caught up {channel}: {count} new messages")
+        self.caught_up.set()
+    
+    async def on_message(self, event):
+        await self.caught_up.wait()
+        channel = self.peers.get(event.chat_id)
+        if not channel:
+            return
+        
+        store = self.stores[channel]
+        synced = self.synced[channel]
+        msg_data = message_record(event.message)
+        # Edits can carry any old id; only new messages extend the contiguous stored range
+        # (MessageEdited.Event subclasses NewMessage.Event, hence the negative check)
+        new = not isinstance(event, events.MessageEdited.Event)
+        
+        def media_done(record):
+            store.append(record)
+            store.sync()
+            if new:
+                synced.done(record['id'])
+                self.state.save()
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(messages, f, indent=2, ensure_ascii=False)
-        print(f"Saved {len(messages)} messages to {filename}")
+        queued = bool(event.message.media) and await self.downloader.submit(event.message, msg_data,
+                                                                            on_complete=media_done)
+        store.append(msg_data)
+        store.sync()
+        if new:
+            synced.add(event.message.id, pending=queued)
+            self.state.save()
+        print(f"{'Edited' if msg_data['edit_date'] else 'New'} message {event.message.id} in {channel}")
+    
+    async def listen(self):
+        await self.scraper(self.channels[0]).connect()
+        for channel in self.channels:
+            self.peers[utils.get_peer_id(await self.client.get_entity(channel))] = channel
+        
+        chats = list(self.peers)
+        self.client.add_event_handler(self.on_message, events.NewMessage(chats=chats))
+        self.client.add_event_handler(self.on_message, events.MessageEdited(chats=chats))
+        
+        async with MediaDownloader(self.client, concurrency=self.media_concurrency) as downloader:
+            self.downloader = downloader
+            while True:
+                await self.catch_up()
+                print(f"Listening to {', '.join(self.channels)}")
+                await self.client.run_until_disconnected()
+                
+                print("Disconnected, reconnecting...")
+                for store in self.stores.values():
+                    store.compact()
+                await self.client.connect()
 
 async def main():
+    # python ts.py [incremental|backfill]
+    # python ts.py listen [channel ...]
+    mode = sys.argv[1] if len(sys.argv) > 1 else 'incremental'
+    
+    if mode == 'listen':
+        listener = TelegramListener(sys.argv[2:] or [GROUP_USERNAME])
+        await listener.listen()
+        return
+    
     scraper = TelegramScraper()
     await scraper.connect()
     
-    # Scrape all messages (or set a limit)
-    messages = await scraper.scrape_messages(limit=None)
-    scraper.save_messages(messages)
+    count = await scraper.scrape_messages(limit=None, mode=mode)
+    scraper.store.compact()
+    print(f"Synced {count} new messages")
     
     await scraper.client.disconnect()
 
@@ -1,116 +1,109 @@
 import json
-import time
+from page_parser import parse
 from playwright.sync_api import sync_playwright
+from browser_service import open_browser
+from article_pool import ArticlePool, ArticleJob
+from resource_policy import ResourcePolicy
+from substack import SubstackArchive
+from readiness import Readiness
+from scroll_harvester import ScrollHarvester
 
 class UnchainedScraper:
-    def __init__(self):
+    def __init__(self, concurrency=4, use_archive_api=True):
         self.base_url = "https://unchainedcrypto.substack.com"
         self.archive_url = f"{self.base_url}/archive"
+        self.resource_policy = ResourcePolicy()
+        self.pool = ArticlePool(browser_type="chromium", concurrency=concurrency, per_domain=concurrency, http_ok=True,
+                                resource_policy=self.resource_policy)
+        self.use_archive_api = use_archive_api
 
-    def random_sleep(self, min_seconds=2, max_seconds=5):
-        time.sleep(min_seconds)
+    def parse_post(self, html, url):
+        """Extract post content from server-rendered HTML (HTTP fetch path)"""
+        content = parse(html).select_one('div.available-content')
+        return content.get_text(separator='\n', strip=True) if content else None
+
+    def scrape_posts(self, posts):
+        all_posts = []
+        
+        # Now scrape individual posts
+        jobs = [ArticleJob(post['url'], wait_for='div.available-content', parse=self.parse_post, html=post.get('html'), script="""
+                    () => {
+                        const content = document.querySelector('div.available-content');
+                        return content ? content.innerText.trim() : '';
+                    }
+                """) for post in posts]
+        
+        print(f"Scraping {len(jobs)} posts with {self.pool.concurrency} tabs...")
+        results = self.pool.run(jobs)
+        
+        for idx, (post, content_data) in enumerate(zip(posts, results), 1):
+            if content_data is None:
+                print(f"Skipping post {idx}/{len(posts)}: {post['url']}")
+                continue
+            
+            post_data = {
+                "post_id": idx,
+                "source": "Unchained",
+                "title": post['title'],
+                "author": post['author'],
+                "publication_date": post['date'],
+                "description": post['description'],
+                "content": content_data,
+                "url": post['url']
+            }
+            
+            all_posts.append(post_data)
+            print(f"Successfully scraped: {post['title']}")
+        
+        # Save results
+        with open("unchained_posts.json", "w", encoding="utf-8") as f:
+            json.dump(all_posts, f, indent=2, ensure_ascii=False)
+        
+        print(f"\nSuccessfully scraped {len(all_posts)} posts!")
+        return all_posts
 
     def scrape_blogs(self):
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=False)
-            page = browser.new_page()
+        if self.use_archive_api:
+            posts = SubstackArchive(self.base_url, include_bodies=True).run()
+            print(f"\nFound {len(posts)} posts through the archive API")
+            return self.scrape_posts(posts)
+        
+        with sync_playwright() as p, open_browser(p, "chromium") as context:
+            page = context.new_page()
+            self.resource_policy.install(page)
             
             try:
                 print(f"Accessing: {self.archive_url}")
                 page.goto(self.archive_url)
-                self.random_sleep(3)
-                
-                all_posts = []
                 
                 # Wait for posts to load
-                page.wait_for_selector("div.post-preview", timeout=30000)
+                Readiness(selector="div.post-preview").wait(page)
                 
-                # Scroll to load all content
+                # Scroll to load all content, collecting posts as they render
                 print("Loading all posts...")
-                last_height = 0
-                while True:
-                    # Scroll down
-                    page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                    self.random_sleep(2)
-                    
-                    # Calculate new scroll height
-                    new_height = page.evaluate("document.body.scrollHeight")
-                    if new_height == last_height:
-                        break
-                    last_height = new_height
-                    print("Scrolling...")
-
-                # Extract posts
-                posts = page.evaluate("""
-                    () => {
-                        const posts = [];
-                        document.querySelectorAll('div.post-preview').forEach(post => {
-                            const titleElem = post.querySelector('h3.post-preview-title');
-                            const linkElem = post.querySelector('a.post-preview-title');
-                            const dateElem = post.querySelector('div.post-preview-date');
-                            const authorElem = post.querySelector('span.post-preview-byline');
-                            const descriptionElem = post.querySelector('div.post-preview-description');
-                            
-                            // Only add if it's a main article URL (not a comments URL)
-                            if (titleElem && linkElem && !linkElem.href.endsWith('/comments')) {
-                                posts.push({
-                                    title: titleElem.innerText.trim(),
-                                    url: linkElem.href,
-                                    date: dateElem ? dateElem.innerText.trim() : '',
-                                    author: authorElem ? authorElem.innerText.trim() : '',
-                                    description: descriptionElem ? descriptionElem.innerText.trim() : ''
-                                });
-                            }
-                        });
-                        return posts;
+                posts = ScrollHarvester('div.post-preview', rate_limiter=self.pool.rate_limiter, extract="""
+                    post => {
+                        const titleElem = post.querySelector('h3.post-preview-title');
+                        const linkElem = post.querySelector('a.post-preview-title');
+                        const dateElem = post.querySelector('div.post-preview-date');
+                        const authorElem = post.querySelector('span.post-preview-byline');
+                        const descriptionElem = post.querySelector('div.post-preview-description');
+                        
+                        // Only add if it's a main article URL (not a comments URL)
+                        if (!titleElem || !linkElem || linkElem.href.endsWith('/comments')) return null;
+                        return {
+                            title: titleElem.innerText.trim(),
+                            url: linkElem.href,
+                            date: dateElem ? dateElem.innerText.trim() : '',
+                            author: authorElem ? authorElem.innerText.trim() : '',
+                            description: descriptionElem ? descriptionElem.innerText.trim() : ''
+                        };
                     }
-                """)
+                """).harvest(page)
                 
                 print(f"\nFound {len(posts)} posts")
                 
-                # Now scrape individual posts
-                for idx, post in enumerate(posts, 1):
-                    try:
-                        print(f"\nScraping post {idx}/{len(posts)}")
-                        print(f"URL: {post['url']}")
-                        
-                        # Visit the post page
-                        page.goto(post['url'])
-                        page.wait_for_selector('div.available-content', timeout=30000)
-                        self.random_sleep(2)
-                        
-                        # Extract post content
-                        content_data = page.evaluate("""
-                            () => {
-                                const content = document.querySelector('div.available-content');
-                                return content ? content.innerText.trim() : '';
-                            }
-                        """)
-                        
-                        post_data = {
-                            "post_id": idx,
-                            "source": "Unchained",
-                            "title": post['title'],
-                            "author": post['author'],
-                            "publication_date": post['date'],
-                            "description": post['description'],
-                            "content": content_data,
-                            "url": post['url']
-                        }
-                        
-                        all_posts.append(post_data)
-                        print(f"Successfully scraped: {post['title']}")
-                        self.random_sleep(2)
-                        
-                    except Exception as e:
-                        print(f"Error scraping post: {str(e)}")
-                        continue
-                
-                # Save results
-                with open("unchained_posts.json", "w", encoding="utf-8") as f:
-                    json.dump(all_posts, f, indent=2, ensure_ascii=False)
-                
-                print(f"\nSuccessfully scraped {len(all_posts)} posts!")
+                self.scrape_posts(posts)
                 
             except Exception as e:
                 print(f"Error during scraping: {str(e)}")
@@ -120,7 +113,7 @@ class UnchainedScraper:
                 print("Saved error.png and error.html for debugging")
                 
             finally:
-                browser.close()
+                page.close()
 
 def main():
     scraper = UnchainedScraper()
@@ -0,0 +1,118 @@
+import asyncio
+import re
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+from page_parser import parse
+from http_fetch import HttpFetcher
+from async_runner import run_sync
+from rate_limiter import shared_limiter
+
+# Webflow paginates each collection list with its own "<collection-id>_page" query parameter
+PAGE_PARAM_RE = re.compile(r"[?&]([\w-]+_page)=(\d+)")
+PAGE_COUNT_RE = re.compile(r"/\s*(\d+)")
+
+
+class WebflowCollection:
+    """Fetches every page of a Webflow collection list over HTTP and merges the cards in order"""
+
+    def __init__(self, url, item_selector, parse_item, scope=None, concurrency=4,
+                 user_agent=None, cookies=None):
+        self.url = url
+        self.item_selector = item_selector
+        # parse_item(item, page_url) turns one card into a dict, or None to skip it
+        self.parse_item = parse_item
+        # CSS selector of the list wrapper, for pages that hold several collection lists
+        self.scope = scope
+        self.concurrency = concurrency
+        self.fetcher_options = {'max_connections': concurrency, 'cookies': cookies,
+                                'rate_limiter': shared_limiter}
+        if user_agent:
+            self.fetcher_options['user_agent'] = user_agent
+
+    def page_url(self, param, number):
+        parts = urlparse(self.url)
+        query = [(key, value) for key, value in parse_qsl(parts.query) if key != param]
+        query.append((param, str(number)))
+        return urlunparse(parts._replace(query=urlencode(query)))
+
+    def _scope(self, html):
+        root = parse(html)
+        return root.select_one(self.scope) if self.scope else root
+
+    def _items(self, scope, page_url):
+        items = []
+        for item in scope.select(self.item_selector):
+            data = self.parse_item(item, page_url)
+            if data:
+                items.append(data)
+        return items
+
+    def _pagination(self, scope):
+        """Return (page parameter, page count); the count is None when the list does not show it"""
+        param = None
+        for link in scope.select('.w-pagination-wrapper a[href], a.w-pagination-next[href]'):
+            match = PAGE_PARAM_RE.search(link['href'])
+            if match:
+                param = match.group(1)
+                break
+
+        count = None
+        page_count = scope.select_one('.w-page-count')
+        if page_count:
+            match = PAGE_COUNT_RE.search(page_count.get_text())
+            if match:
+                count = int(match.group(1))
+        return param, count
+
+    async def _page_items(self, http, slots, param, number):
+        async with slots:
+            page_url = self.page_url(param, number)
+            html = await http.fetch_html(page_url, min_text=0)
+            if html is None:
+                raise RuntimeError(f"Page {number} of {self.url} is not available over HTTP")
+            scope = self._scope(html)
+            return self._items(scope, page_url) if scope else []
+
+    async def fetch_items(self):
+        """Return every card of the list, or None when the list needs a browser"""
+        async with HttpFetcher(**self.fetcher_options) as http:
+            html = await http.fetch_html(self.url, min_text=0)
+            if html is None:
+                return None
+            scope = self._scope(html)
+            if scope is None:
+                return None
+
+            items = self._items(scope, self.url)
+            param, count = self._pagination(scope)
+            if not items or not param:
+                return items or None
+
+            slots = asyncio.Semaphore(self.concurrency)
+            try:
+                if count:
+                    print(f"Fetching {count} pages of {self.url}")
+                    pages = await asyncio.gather(*(
+                        self._page_items(http, slots, param, number) for number in range(2, count + 1)
+                    ))
+                    for page_items in pages:
+                        items.extend(page_items)
+                    return items
+
+                # No page count rendered: fetch in waves until an empty page
+                number = 2
+                while True:
+                    numbers = list(range(number, number + self.concurrency))
+                    pages = await asyncio.gather(*(
+                        self._page_items(http, slots, param, n) for n in numbers
+                    ))
+                    for page_items in pages:
+                        items.extend(page_items)
+                    if any(not page_items for page_items in pages):
+                        return items
+                    number += self.concurrency
+            except RuntimeError as e:
+                print(str(e))
+                return None
+
+    def run(self):
+        return run_sync(self.fetch_items())
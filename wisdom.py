@@ -1,21 +1,28 @@
 import json
-import time
 from playwright.sync_api import sync_playwright
+from browser_service import open_browser
+from article_pool import ArticlePool, ArticleJob
+from resource_policy import ResourcePolicy
+from readiness import Readiness
+from scroll_harvester import ScrollHarvester
+from block_text import BlockText, BLOCK_TEXT_SCRIPT
 
 class WizdomScraper:
-    def __init__(self):
+    def __init__(self, concurrency=4):
         self.base_url = "https://www.weeklywizdom.com"
         self.archive_url = f"{self.base_url}/archive?tags=Newsletter"
+        self.resource_policy = ResourcePolicy()
+        self.pool = ArticlePool(browser_type="firefox", concurrency=concurrency, per_domain=concurrency,
+                                resource_policy=self.resource_policy)
 
     def scrape_newsletters(self):
-        with sync_playwright() as p:
-            browser = p.firefox.launch(headless=False)
-            page = browser.new_page()
+        with sync_playwright() as p, open_browser(p, "firefox") as context:
+            page = context.new_page()
+            self.resource_policy.install(page)
             
             try:
                 print(f"Accessing: {self.archive_url}")
                 page.goto(self.archive_url)
-                time.sleep(5)
                 
                 all_articles = []
                 page_num = 1
@@ -26,39 +33,29 @@ class WizdomScraper:
                     
                     try:
                         # Wait for content to load
-                        page.wait_for_selector("div.grid.grid-cols-1.gap-6", timeout=30000)
+                        Readiness(selector="div.grid.grid-cols-1.gap-6", network_idle=True).wait(page)
                         
-                        # Scroll to load all content on current page
+                        # Scroll until the page's lazily loaded cards stop appearing, reading each once
                         print("Loading all articles...")
-                        for _ in range(3):  # Reduced scrolls per page
-                            page.keyboard.press('End')
-                            time.sleep(2)
-                            print("Scrolling...")
-
-                        # Extract articles from current page
-                        articles = page.evaluate("""
-                            () => {
-                                const articles = [];
-                                document.querySelectorAll('div.transparent.h-full.cursor-pointer.overflow-hidden.rounded-lg.flex.flex-col.border').forEach(post => {
-                                    const titleElem = post.querySelector('h2');
-                                    const linkElem = post.querySelector('a[href*="/p/"]');
-                                    const excerptElem = post.querySelector('p.line-clamp-2');
-                                    const dateElem = post.querySelector('time');
-                                    const imageElem = post.querySelector('img');
-                                    
-                                    if (titleElem && linkElem) {
-                                        articles.push({
-                                            title: titleElem.innerText.trim(),
-                                            url: linkElem.href,
-                                            excerpt: excerptElem ? excerptElem.innerText.trim() : '',
-                                            date: dateElem ? dateElem.getAttribute('datetime') : '',
-                                            image: imageElem ? imageElem.src : null
-                                        });
-                                    }
-                                });
-                                return articles;
+                        articles = ScrollHarvester(
+                            'div.transparent.h-full.cursor-pointer.overflow-hidden.rounded-lg.flex.flex-col.border',
+                            detach=False, rate_limiter=self.pool.rate_limiter, extract="""
+                            (post) => {
+                                const titleElem = post.querySelector('h2');
+                                const linkElem = post.querySelector('a[href*="/p/"]');
+                                const excerptElem = post.querySelector('p.line-clamp-2');
+                                const dateElem = post.querySelector('time');
+                                const imageElem = post.querySelector('img');
+                                if (!titleElem || !linkElem) return null;
+                                return {
+                                    title: titleElem.innerText.trim(),
+                                    url: linkElem.href,
+                                    excerpt: excerptElem ? excerptElem.innerText.trim() : '',
+                                    date: dateElem ? dateElem.getAttribute('datetime') : '',
+                                    image: imageElem ? imageElem.src : null
+                                };
                             }
-                        """)
+                        """).harvest(page)
                         
                         if not articles:  # If no articles found, we've reached the end
                             print("No articles found on this page - reached the end")
@@ -84,6 +81,7 @@ class WizdomScraper:
                             break
                             
                         # Click next page
+                        previous_url = page.url
                         page.evaluate("""
                             () => {
                                 const nextButton = Array.from(document.querySelectorAll('a')).find(a => 
@@ -95,7 +93,8 @@ class WizdomScraper:
                             }
                         """)
                         
-                        time.sleep(5)  # Wait for next page to load
+                        # Wait for the next page URL; readiness is checked at the top of the loop
+                        page.wait_for_function("(previous) => location.href !== previous", arg=previous_url, timeout=30000)
                         page_num += 1
                         
                     except Exception as e:
@@ -105,52 +104,34 @@ class WizdomScraper:
                 print(f"\nTotal newsletters found across all pages: {len(all_articles)}")
                 
                 # Now scrape individual articles
+                # Each text node is read once, from leaf blocks in document order, skipping nav and footer
+                content_text = BlockText(root='div.flex.min-h-screen.flex-col').config()
+                jobs = [ArticleJob(article['url'], wait_for='div.flex.min-h-screen.flex-col',
+                                   script=BLOCK_TEXT_SCRIPT, arg=content_text)
+                        for article in all_articles]
+                
+                print(f"Scraping {len(jobs)} newsletters with {self.pool.concurrency} tabs...")
+                results = self.pool.run(jobs)
+                
                 newsletters = []
-                for idx, article in enumerate(all_articles, 1):
-                    try:
-                        print(f"\nScraping newsletter {idx}/{len(all_articles)}")
-                        print(f"URL: {article['url']}")
-                        
-                        # Visit the article page
-                        page.goto(article['url'])
-                        page.wait_for_selector('div.flex.min-h-screen.flex-col', timeout=30000)
-                        time.sleep(3)
-                        
-                        # Extract article content
-                        content_data = page.evaluate("""
-                            () => {
-                                const contentDivs = document.querySelectorAll('div.flex.min-h-screen.flex-col div');
-                                let content = '';
-                                
-                                contentDivs.forEach(div => {
-                                    const text = div.innerText.trim();
-                                    if (text && !div.querySelector('nav')) {
-                                        content += text + '\\n\\n';
-                                    }
-                                });
-                                
-                                return content.trim();
-                            }
-                        """)
-                        
-                        newsletter_data = {
-                            "newsletter_id": idx,
-                            "source": "Weekly Wizdom",
-                            "title": article['title'],
-                            "publication_date": article['date'],
-                            "excerpt": article['excerpt'],
-                            "content": content_data,
-                            "url": article['url'],
-                            "image": article['image']
-                        }
-                        
-                        newsletters.append(newsletter_data)
-                        print(f"Successfully scraped: {article['title']}")
-                        time.sleep(2)
-                        
-                    except Exception as e:
-                        print(f"Error scraping article: {str(e)}")
+                for idx, (article, content_data) in enumerate(zip(all_articles, results), 1):
+                    if content_data is None:
+                        print(f"Skipping newsletter {idx}/{len(all_articles)}: {article['url']}")
                         continue
+                    
+                    newsletter_data = {
+                        "newsletter_id": idx,
+                        "source": "Weekly Wizdom",
+                        "title": article['title'],
+                        "publication_date": article['date'],
+                        "excerpt": article['excerpt'],
+                        "content": content_data,
+                        "url": article['url'],
+                        "image": article['image']
+                    }
+                    
+                    newsletters.append(newsletter_data)
+                    print(f"Successfully scraped: {article['title']}")
                 
                 # Save results
                 with open("weekly_wizdom_newsletters.json", "w", encoding="utf-8") as f:
@@ -166,7 +147,7 @@ class WizdomScraper:
                 print("Saved error.png and error.html for debugging")
                 
             finally:
-                browser.close()
+                page.close()
 
 def main():
     scraper = WizdomScraper()